@@ -1,8 +1,17 @@
 # -*- coding:utf-8 -*-
 import logging
+import sys
+import threading
+import weakref
+from collections import OrderedDict
+from copy import deepcopy
+from functools import partial
+from time import perf_counter
+from types import MappingProxyType
+from sqlalchemy import event
 import sqlalchemy.types as t
-import sqlalchemy.dialects.postgresql as pgt
 from sqlalchemy.inspection import inspect
+from sqlalchemy.orm import Mapper
 from sqlalchemy.orm.properties import ColumnProperty
 from sqlalchemy.orm.relationships import RelationshipProperty
 from sqlalchemy.sql.visitors import Visitable
@@ -42,8 +51,6 @@ JSON Schema defines seven primitive types for JSON values:
 
 #  tentative
 default_column_to_schema = {
-    pgt.JSONB: "object",
-    pgt.UUID: "string",
     t.ARRAY: "array",
     t.JSON: "object",
     t.String: "string",
@@ -69,6 +76,23 @@ default_column_to_schema = {
 if getattr(t, "Binary", None) is not None:
     default_column_to_schema[t.Binary] = "xxx"
 
+if getattr(t, "Uuid", None) is not None:  # sqlalchemy>=2.0
+    default_column_to_schema[t.Uuid] = "string"
+    default_column_to_schema[t.UUID] = "string"  # postgresql.UUID
+else:
+    import sqlalchemy.dialects.postgresql as pgt
+
+    default_column_to_schema[pgt.JSONB] = "object"
+    default_column_to_schema[pgt.UUID] = "string"
+
+
+def _add_postgresql_types(mapping):
+    # the dialect is slow to import, so postgresql.JSONB is added after it is
+    # imported by the user (when the column is classified, it is imported)
+    pgt = sys.modules.get("sqlalchemy.dialects.postgresql")
+    if pgt is not None and pgt.JSONB not in mapping:
+        mapping[pgt.JSONB] = "object"
+
 
 # restriction
 def string_max_length(column, sub):
@@ -106,16 +130,51 @@ class Classifier(object):
         self.mapping = mapping
         self.see_mro = see_mro
         self.see_impl = see_impl
+        self.invalidate()
 
     def __getitem__(self, k):
         cls = k.__class__
-        _, mapped = get_class_mapping(
-            self.mapping, cls, see_mro=self.see_mro, see_impl=self.see_impl
-        )
+        _, mapped = self.lookup(cls)
         if mapped is None:
             raise InvalidStatus("notfound: {k}. (cls={cls})".format(k=k, cls=cls))
         return cls, mapped
 
+    def lookup(self, cls):
+        # cache: cls -> found type. (mro and impl scans are slow)
+        mapping = self.mapping
+        state = (id(mapping), len(mapping))
+        if state != self._state:
+            self.invalidate()
+            self._state = state
+
+        if cls in self._cache:
+            type_ = self._cache[cls]
+            if type_ is None:
+                return None, None
+            v = mapping.get(type_)
+            if v is not None:
+                return type_, v
+
+        if mapping is default_column_to_schema:
+            _add_postgresql_types(mapping)  # if added, the cache is invalidated later
+        type_, v = get_class_mapping(
+            mapping, cls, see_mro=self.see_mro, see_impl=self.see_impl
+        )
+        self._cache[cls] = type_
+        return type_, v
+
+    def invalidate(self):
+        # if the mapping is mutated without changing its size, call this.
+        self._cache = {}
+        self._state = None
+
+    def __getstate__(self):
+        # the cache is not pickled (e.g. sending to worker process)
+        state = self.__dict__.copy()
+        state["_cache"] = {}
+        state["_state"] = None
+        return state
+
 
 def get_class_mapping(mapping, cls, see_mro=True, see_impl=True):
     v = mapping.get(cls)
@@ -144,6 +203,43 @@ DefaultClassfier = Classifier(default_column_to_schema)
 Empty = ()
 
 
+class MapperPlan(object):
+    """precomputed properties of a mapper, shared by all walkers"""
+
+    def __init__(self, mapper):
+        # mapper.column_attrs and mapper.attrs is not ordered.
+        self.relationships = list(mapper.relationships)  # configured, here
+        self.columns = [
+            mapper._props[c.name] for c in mapper.local_table.columns
+        ]  # danger!! not immutable
+        self.foreign_keys = frozenset(
+            prop
+            for prop in self.columns
+            if any(c.foreign_keys for c in getattr(prop, "columns", Empty))
+        )
+        # (walker class, includes, excludes) -> [(prop, required)]
+        self.required = {}
+
+
+_mapper_plans = weakref.WeakKeyDictionary()
+
+
+def get_mapper_plan(mapper):
+    plan = _mapper_plans.get(mapper)
+    if plan is None:
+        plan = _mapper_plans[mapper] = MapperPlan(mapper)
+    return plan
+
+
+def _keyset(keys):
+    if keys is None:
+        return None
+    try:
+        return frozenset(keys)
+    except TypeError:  # e.g. backref=("name", {...}), never matched
+        return frozenset(k for k in keys if isinstance(k, str))
+
+
 class BaseModelWalker(object):
     def __init__(self, model, includes=None, excludes=None, history=None):
         self.mapper = inspect(model).mapper
@@ -155,6 +251,12 @@ class BaseModelWalker(object):
                 raise InvalidStatus(
                     "Conflict includes={}, exclude={}".format(includes, excludes)
                 )
+        self._includes = _keyset(includes)
+        self._excludes = _keyset(excludes)
+
+    @property
+    def plan(self):
+        return get_mapper_plan(self.mapper)
 
     def clone(self, name, mapper, includes, excludes, history):
         return self.__class__(mapper, includes, excludes, history)
@@ -162,53 +264,51 @@ class BaseModelWalker(object):
     def from_child(self, model):
         return self.__class__(model, history=self.history)
 
+    def is_target(self, prop):
+        return (self._includes is None or prop.key in self._includes) and (
+            self._excludes is None or prop.key not in self._excludes
+        )
+
 
 # mapper.column_attrs and mapper.attrs is not ordered. define our custom iterate function `iterate'
 
 
 class ForeignKeyWalker(BaseModelWalker):
     def iterate(self):
-        for c in self.mapper.local_table.columns:
-            yield self.mapper._props[c.name]  # danger!! not immutable
+        return iter(self.plan.columns)
 
     def walk(self):
         for prop in self.iterate():
-            if self.includes is None or prop.key in self.includes:
-                if self.excludes is None or prop.key not in self.excludes:
-                    yield prop
+            if self.is_target(prop):
+                yield prop
 
 
 class NoForeignKeyWalker(BaseModelWalker):
     def iterate(self):
-        for c in self.mapper.local_table.columns:
-            yield self.mapper._props[c.name]  # danger!! not immutable
+        return iter(self.plan.columns)
 
     def walk(self):
+        foreign_keys = self.plan.foreign_keys
         for prop in self.iterate():
-            if self.includes is None or prop.key in self.includes:
-                if self.excludes is None or prop.key not in self.excludes:
-                    if not any(c.foreign_keys for c in getattr(prop, "columns", Empty)):
-                        yield prop
+            if self.is_target(prop):
+                if prop not in foreign_keys:
+                    yield prop
 
 
 class StructuralWalker(BaseModelWalker):
     def iterate(self):
-        # self.mapper.attrs
-        for c in self.mapper.local_table.columns:
-            yield self.mapper._props[c.name]  # danger!! not immutable
-        for prop in self.mapper.relationships:
-            yield prop
+        plan = self.plan
+        yield from plan.columns
+        yield from plan.relationships
 
     def walk(self):
+        foreign_keys = self.plan.foreign_keys
+        history = set(self.history)
         for prop in self.iterate():
             if isinstance(prop, (ColumnProperty, RelationshipProperty)):
-                if self.includes is None or prop.key in self.includes:
-                    if self.excludes is None or prop.key not in self.excludes:
-                        if prop not in self.history:
-                            if not any(
-                                c.foreign_keys for c in getattr(prop, "columns", Empty)
-                            ):
-                                yield prop
+                if self.is_target(prop):
+                    if prop not in history and prop not in foreign_keys:
+                        yield prop
 
 
 def get_children(name, params, splitter=".", default=None):  # todo: rename
@@ -283,11 +383,116 @@ class ChildFactory(object):
             history=history,
             toplevel=False,
         )
-        if prop.direction == ONETOMANY:
+        if self.child_type(prop) == "array":
             return {"type": "array", "items": subschema}
         else:
             return {"type": "object", "properties": subschema}
 
+    def child_type(self, prop):
+        return "array" if prop.direction == ONETOMANY else "object"
+
+
+class ReferenceChildFactory(ChildFactory):
+    """not recursing into relationships, used by SchemaFactory.build_definitions()"""
+
+    def __init__(self, splitter=".", bidirectional=False):
+        super().__init__(splitter=splitter, bidirectional=bidirectional)
+        self.referenced = []  # models
+
+    def child_schema(
+        self, prop, schema_factory, root_schema, walker, overrides, depth, history
+    ):
+        self.referenced.append(prop.mapper.class_)
+        if prop.direction == ONETOMANY:
+            return {"type": "array", "items": {}}
+        else:
+            return {"type": "object", "properties": {}}
+
+
+class LazyDefinitions(dict):
+    """definitions, each entry is built on first access (e.g. resolving `$ref`)
+
+    keys(), values(), items() and iteration (also dict(), update(),
+    json.dumps(), copy, pickle) build all entries.
+    if the same name is defined twice, the last one is used (same as eager build).
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.pending = {}  # name -> function returning the definition
+        self.defining = True  # False, after all entries are defined
+
+    def define(self, name, build):
+        if not self.__contains__(name):
+            super().__setitem__(name, None)  # placeholder
+        self.pending[name] = build
+
+    def __getitem__(self, name):
+        build = self.pending.pop(name, None)
+        if build is not None:
+            super().__setitem__(name, build())
+        return super().__getitem__(name)
+
+    def __setitem__(self, name, value):
+        self.pending.pop(name, None)
+        super().__setitem__(name, value)
+
+    def materialize(self):
+        while self.pending:
+            self[next(iter(self.pending))]
+        return self
+
+    def get(self, name, default=None):
+        if self.__contains__(name):
+            return self[name]
+        return default
+
+    def pop(self, name, *default):
+        if self.__contains__(name):
+            self[name]
+        return super().pop(name, *default)
+
+    # overridden, so dict(), update() and {**d} use keys() and __getitem__()
+    # (not the storage, having placeholders). building an entry can define
+    # the other entries, so all entries are built before iterating.
+    def __iter__(self):
+        return super(LazyDefinitions, self.materialize()).__iter__()
+
+    def keys(self):
+        return super(LazyDefinitions, self.materialize()).keys()
+
+    def values(self):
+        return super(LazyDefinitions, self.materialize()).values()
+
+    def items(self):
+        return super(LazyDefinitions, self.materialize()).items()
+
+    def copy(self):
+        return dict(self.items())
+
+    def __eq__(self, other):
+        return super(LazyDefinitions, self.materialize()).__eq__(other)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(self.copy())
+
+    def __reduce_ex__(self, protocol):
+        # copied or pickled as plain dict
+        return (dict, (self.copy(),))
+
+
+def materialize(schema):
+    """build all pending definitions of the schema (generated with lazy=True)"""
+    definitions = schema.get("definitions")
+    if isinstance(definitions, LazyDefinitions):
+        definitions.materialize()
+    return schema
+
 
 RELATIONSHIP = "relationship"
 FOREIGNKEY = "foreignkey"
@@ -331,6 +536,106 @@ class UseForeignKeyIfPossibleDecision(object):
             raise NotImplemented(prop)
 
 
+def freeze(data):
+    """immutable view of schema"""
+    if hasattr(data, "items"):
+        return MappingProxyType({k: freeze(v) for k, v in data.items()})
+    elif isinstance(data, (list, tuple)):
+        return tuple(freeze(v) for v in data)
+    else:
+        return data
+
+
+def _hashable(data):
+    if hasattr(data, "items"):
+        return tuple(sorted((k, _hashable(v)) for k, v in data.items()))
+    elif isinstance(data, (list, tuple, set)):
+        return tuple(_hashable(v) for v in data)
+    else:
+        return data
+
+
+_caches = weakref.WeakSet()
+
+
+@event.listens_for(Mapper, "after_configured")
+def _clear_caches():
+    # new mappers are configured, cached schemas may be stale
+    _mapper_plans.clear()
+    for cache in list(_caches):
+        cache.clear()
+
+
+class SchemaCache(object):
+    """LRU cache of generated schemas, for SchemaFactory(cache=SchemaCache())
+
+    view is applied to the stored schema on each access
+    (copy.deepcopy (default), freeze, or None for using it as is).
+    """
+
+    def __init__(self, maxsize=128, view=deepcopy):
+        self.maxsize = maxsize
+        self.view = view
+        self.store = OrderedDict()
+        self.lock = threading.Lock()
+        _caches.add(self)
+
+    def key(self, model, includes, excludes, overrides, depth, adjust_required):
+        return (
+            model,
+            _hashable(includes),
+            _hashable(excludes),
+            _hashable(overrides),
+            depth,
+            adjust_required,
+        )
+
+    def get(self, k):
+        with self.lock:
+            schema = self.store.get(k)
+            if schema is not None:
+                self.store.move_to_end(k)
+        if schema is None or self.view is None:
+            return schema
+        return self.view(schema)
+
+    def set(self, k, schema):
+        with self.lock:
+            self.store[k] = schema
+            self.store.move_to_end(k)
+            while len(self.store) > self.maxsize:
+                self.store.popitem(last=False)
+        if self.view is None:
+            return schema
+        return self.view(schema)
+
+    def clear(self):
+        with self.lock:
+            self.store.clear()
+
+    def __len__(self):
+        return len(self.store)
+
+
+def _is_required(prop):
+    return any(
+        not c.nullable and (c.default is None and c.server_default is None)
+        for c in getattr(prop, "columns", Empty)
+    )
+
+
+def _build_reference_schema(factory, depth, model):
+    # not recursing into relationships, returns (schema, referenced models)
+    child_factory = ReferenceChildFactory(
+        splitter=getattr(factory.child_factory, "splitter", "."),
+        bidirectional=getattr(factory.child_factory, "bidirectional", False),
+    )
+    factory = factory._replace(child_factory=child_factory)
+    schema = factory(model, depth=depth)
+    schema.pop("definitions", None)
+    return schema, child_factory.referenced
+
+
 class SchemaFactory(object):
     def __init__(
         self,
@@ -340,13 +645,18 @@ class SchemaFactory(object):
         container_factory=dict,
         child_factory=ChildFactory("."),
         relation_decision=RelationDesicion(),
+        cache=None,
+        observer=None,
     ):
         self.container_factory = container_factory
         self.classifier = classifier
         self.walker = walker  # class
         self.restriction_set = [{k: v} for k, v in restriction_dict.items()]
+        self._restriction_cache = {}  # type -> restriction functions
         self.child_factory = child_factory
         self.relation_decision = relation_decision
+        self.cache = cache  # SchemaCache (opt-in)
+        self.observer = observer  # SchemaObserver (opt-in)
 
     def __call__(
         self,
@@ -356,15 +666,64 @@ class SchemaFactory(object):
         excludes=None,
         overrides=None,
         depth=None,
-        adjust_required=None
+        adjust_required=None,
+        lazy=False
+    ):
+        # if lazy=True, definitions are built on first access (see: LazyDefinitions)
+        # and the cache is not used (the eager and lazy results must not be mixed)
+        if self.cache is None or lazy:
+            return self._build_schema(
+                model, includes, excludes, overrides, depth, adjust_required, lazy
+            )
+
+        k = self.cache.key(model, includes, excludes, overrides, depth, adjust_required)
+        try:
+            schema = self.cache.get(k)
+        except TypeError:  # unhashable
+            return self._build_schema(
+                model, includes, excludes, overrides, depth, adjust_required, lazy
+            )
+        if schema is None:
+            schema = self._build_schema(
+                model, includes, excludes, overrides, depth, adjust_required, lazy
+            )
+            schema = self.cache.set(k, schema)
+        return schema
+
+    def _build_schema(
+        self, model, includes, excludes, overrides, depth, adjust_required, lazy=False
+    ):
+        observer = self.observer
+        if observer is None:
+            return self._build_model_schema(
+                model, includes, excludes, overrides, depth, adjust_required, lazy
+            )
+
+        observer.model_start(model)
+        st = perf_counter()
+        try:
+            return self._build_model_schema(
+                model, includes, excludes, overrides, depth, adjust_required, lazy
+            )
+        finally:
+            observer.model_end(model, perf_counter() - st)
+
+    def _build_model_schema(
+        self, model, includes, excludes, overrides, depth, adjust_required, lazy
     ):
         walker = self.walker(model, includes=includes, excludes=excludes)
         overrides = CollectionForOverrides(overrides or {})
 
         schema = {"title": model.__name__, "type": "object"}
+        if lazy:
+            schema["definitions"] = LazyDefinitions()
         schema["properties"] = self._build_properties(
             walker, schema, overrides=overrides, depth=depth
         )
+        if lazy:
+            schema["definitions"].defining = False
+            if not schema["definitions"]:
+                schema.pop("definitions")
 
         if overrides.not_used_keys:
             raise InvalidStatus("invalid overrides: {}".format(overrides.not_used_keys))
@@ -378,7 +737,81 @@ class SchemaFactory(object):
             schema["required"] = required
         return schema
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_restriction_cache"] = {}
+        state["cache"] = None
+        state["observer"] = None  # events in the other process are not collected
+        return state
+
+    def build_definitions(self, models, *, depth=None, map=map):
+        """schemas of models, keyed by name. each model is visited only once
+
+        relationships are connected by $ref, and referenced models are also included.
+        (passing `map=executor.map`, schemas are built in parallel)
+        """
+        definitions = {}
+        for _, schema, _ in self.iterate_definitions(models, depth=depth, map=map):
+            definitions[schema["title"]] = schema
+        return definitions
+
+    def iterate_definitions(self, models, *, depth=None, map=map, reuse=None):
+        """yield (model, schema, referenced models), level by level
+
+        reuse is a dict, model -> (schema, referenced models), used instead of building.
+        """
+        reuse = reuse or {}
+        build = partial(_build_reference_schema, self._replace(cache=None), depth)
+        seen = set()
+        pending = list(models)
+        while pending:
+            targets = []
+            for model in pending:
+                if model not in seen:
+                    seen.add(model)
+                    targets.append(model)
+            pending = []
+            built = iter(map(build, [m for m in targets if m not in reuse]))
+            for model in targets:
+                if model in reuse:
+                    schema, referenced = reuse[model]
+                else:
+                    schema, referenced = next(built)
+                yield model, schema, referenced
+                pending.extend(referenced)
+
+    def _replace(self, **kwargs):
+        # shallow copy, sharing caches (copy.copy() drops them, via __getstate__)
+        new = self.__class__.__new__(self.__class__)
+        new.__dict__.update(self.__dict__)
+        new.__dict__.update(kwargs)
+        return new
+
+    def _classify(self, column):
+        observer = self.observer
+        if observer is None:
+            return self.classifier[column.type]
+        st = perf_counter()
+        itype, typ = self.classifier[column.type]
+        observer.classified(column, itype, perf_counter() - st)
+        return itype, typ
+
     def _add_restriction_if_found(self, D, column, itype):
+        fns = self._restriction_cache.get(itype)
+        if fns is None:
+            fns = self._restriction_cache[itype] = self._find_restrictions(itype)
+        observer = self.observer
+        if observer is None:
+            for fn in fns:
+                fn(column, D)
+            return
+        for fn in fns:
+            st = perf_counter()
+            fn(column, D)
+            observer.restricted(column, fn, perf_counter() - st)
+
+    def _find_restrictions(self, itype):
+        r = []
         for restriction_dict in self.restriction_set:
             _, fn = get_class_mapping(
                 restriction_dict,
@@ -388,10 +821,10 @@ class SchemaFactory(object):
             )
             if fn is not None:
                 if isinstance(fn, (list, tuple)):
-                    for f in fn:
-                        f(column, D)
+                    r.extend(fn)
                 else:
-                    fn(column, D)
+                    r.append(fn)
+        return r
 
     def _add_property_with_reference(
         self, walker, root_schema, current_schema, prop, val
@@ -414,6 +847,91 @@ class SchemaFactory(object):
             val["required"] = self._detect_required(walker.from_child(prop.mapper))
             root_schema["definitions"][clsname] = val
 
+    def _child_schema(self, prop, root_schema, walker, overrides, depth, history):
+        observer = self.observer
+        if observer is None:
+            return self.child_factory.child_schema(
+                prop, self, root_schema, walker, overrides, depth=depth, history=history
+            )
+
+        observer.child_schema_start(prop)
+        st = perf_counter()
+        try:
+            return self.child_factory.child_schema(
+                prop, self, root_schema, walker, overrides, depth=depth, history=history
+            )
+        finally:
+            observer.child_schema_end(prop, perf_counter() - st)
+
+    def _add_relationship(
+        self, walker, root_schema, current_schema, prop, overrides, depth, history
+    ):
+        if isinstance(root_schema.get("definitions"), LazyDefinitions):
+            return self._add_lazy_property_with_reference(
+                walker, root_schema, current_schema, prop, overrides, depth, history
+            )
+
+        history.append(prop)
+        subwalker = self.child_factory.child_walker(prop, walker, history=history)
+        suboverrides = self.child_factory.child_overrides(prop, overrides)
+        value = self._child_schema(
+            prop, root_schema, subwalker, suboverrides, depth, history
+        )
+        self._add_property_with_reference(
+            walker, root_schema, current_schema, prop, value
+        )
+        history.pop()
+
+    def _add_lazy_property_with_reference(
+        self, walker, root_schema, current_schema, prop, overrides, depth, history
+    ):
+        clsname = prop.mapper.class_.__name__
+        ref = {"$ref": "#/definitions/{}".format(clsname)}
+        if self.child_factory.child_type(prop) == "array":
+            current_schema[prop.key] = {"type": "array", "items": ref}
+        else:
+            current_schema[prop.key] = ref
+
+        definitions = root_schema["definitions"]
+        if not definitions.defining:  # building an entry, already defined
+            return
+
+        # the walkers share the history list, so it is copied for later use
+        history = history + [prop]
+        subwalker = self.child_factory.child_walker(prop, walker, history=history)
+        suboverrides = self.child_factory.child_overrides(prop, overrides)
+        required = self._detect_required(subwalker.from_child(prop.mapper))
+
+        # the descendants are defined first, in the same order as the eager build
+        # (the relationships only, the other properties are built on access)
+        self._define_references(
+            subwalker, root_schema, suboverrides, (depth and depth - 1), history
+        )
+
+        def build():
+            val = self._child_schema(
+                prop, root_schema, subwalker, suboverrides, depth, history
+            )
+            if val["type"] != "object":  # array
+                val["type"] = "object"
+                val["properties"] = val.pop("items")
+            val["required"] = required
+            return val
+
+        definitions.define(clsname, build)
+
+    def _define_references(self, walker, root_schema, overrides, depth, history):
+        if depth is not None and depth <= 0:
+            return
+        for prop in walker.walk():
+            for action, prop, opts in self.relation_decision.desicion(
+                walker, prop, False
+            ):
+                if action == RELATIONSHIP:
+                    self._add_lazy_property_with_reference(
+                        walker, root_schema, {}, prop, overrides, depth, history
+                    )
+
     def _build_properties(
         self, walker, root_schema, overrides, depth=None, history=None, toplevel=True
     ):
@@ -429,29 +947,14 @@ class SchemaFactory(object):
                 walker, prop, toplevel
             ):
                 if action == RELATIONSHIP:  # RelationshipProperty
-                    history.append(prop)
-                    subwalker = self.child_factory.child_walker(
-                        prop, walker, history=history
-                    )
-                    suboverrides = self.child_factory.child_overrides(prop, overrides)
-                    value = self.child_factory.child_schema(
-                        prop,
-                        self,
-                        root_schema,
-                        subwalker,
-                        suboverrides,
-                        depth=depth,
-                        history=history,
+                    self._add_relationship(
+                        walker, root_schema, D, prop, overrides, depth, history
                     )
-                    self._add_property_with_reference(
-                        walker, root_schema, D, prop, value
-                    )
-                    history.pop()
                 elif action == FOREIGNKEY:  # ColumnProperty
                     for c in prop.columns:
                         sub = {}
                         if type(c.type) != Visitable:
-                            itype, sub["type"] = self.classifier[c.type]
+                            itype, sub["type"] = self._classify(c)
 
                             self._add_restriction_if_found(sub, c, itype)
 
@@ -471,15 +974,27 @@ class SchemaFactory(object):
         return D
 
     def _detect_required(self, walker, *, adjust_required=None):
+        history = set(walker.history)
         r = []
-        for prop in walker.walk():
-            columns = getattr(prop, "columns", Empty)
-            required = any(
-                not c.nullable and (c.default is None and c.server_default is None)
-                for c in columns
-            )
+        for prop, required in self._scan_required(walker):
+            if prop in history:
+                continue
             if adjust_required is not None:
                 required = adjust_required(prop, required)
             if required:
                 r.append(prop.key)
         return r
+
+    def _scan_required(self, walker):
+        # cached per mapper, scanned without history (history is filtered by caller)
+        if not hasattr(walker, "plan"):  # not BaseModelWalker
+            return [(prop, _is_required(prop)) for prop in walker.walk()]
+        k = (walker.__class__, walker._includes, walker._excludes)
+        cache = walker.plan.required
+        pairs = cache.get(k)
+        if pairs is None:
+            walker = walker.__class__(
+                walker.mapper, includes=walker.includes, excludes=walker.excludes
+            )
+            pairs = cache[k] = [(prop, _is_required(prop)) for prop in walker.walk()]
+        return pairs
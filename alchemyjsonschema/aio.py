@@ -0,0 +1,101 @@
+# -*- coding:utf-8 -*-
+"""
+AsyncSession support
+
+    users = (await session.scalars(select(User))).all()
+    await mapping.ajsondicts_from_objects(users)
+
+    async for jsondict in mapping.astream_jsondicts(session, select(User)):
+        ...
+
+the relationships in the schema are preloaded by loader_options() (one
+await per level of nesting, see: loading.py), and then serialized in
+AsyncSession.run_sync(), so no MissingGreenlet is raised even if some
+attributes are not loaded (e.g. expired).
+"""
+
+from sqlalchemy import inspect, select, tuple_
+from .loading import loader_options
+from .dictify import jsonify, apply_changes, marker, Memo, DEFAULT_CHUNKSIZE
+
+PRELOAD_CHUNKSIZE = 500  # the number of primary keys in an IN clause
+
+
+def object_session(ob):
+    from sqlalchemy.ext.asyncio import async_object_session
+
+    return async_object_session(ob)
+
+
+def _find_session(obs):
+    for ob in obs:
+        if ob is not None:
+            return object_session(ob)
+    return None
+
+
+async def preload(session, obs, schema, model=None, chunksize=PRELOAD_CHUNKSIZE):
+    """load the relationships in the schema, for the persistent objects"""
+    identities = []
+    for ob in obs:
+        if ob is None:
+            continue
+        identity = inspect(ob).identity
+        if identity is not None:
+            identities.append(identity)
+            model = model or ob.__class__
+    if not identities:
+        return
+
+    columns = inspect(model).primary_key
+    options = loader_options(model, schema)
+    for i in range(0, len(identities), chunksize):
+        chunk = identities[i : i + chunksize]
+        if len(columns) == 1:
+            cond = columns[0].in_([identity[0] for identity in chunk])
+        else:
+            cond = tuple_(*columns).in_(chunk)
+        await session.execute(select(model).where(cond).options(*options))
+
+
+async def run_preloaded(session, obs, schema, fn, model=None):
+    """preload, and then call fn() (lazy loads are also allowed, in run_sync())"""
+    session = session or _find_session(obs)
+    if session is None:  # e.g. transient objects
+        return fn()
+    await preload(session, obs, schema, model=model)
+    return await session.run_sync(lambda _: fn())
+
+
+async def ajsonify(ob, schema, verbose=False, session=None, **kwargs):
+    """async version of jsonify()"""
+    return await run_preloaded(
+        session, [ob], schema, lambda: jsonify(ob, schema, verbose=verbose, **kwargs)
+    )
+
+
+async def aapply_changes(ob, params, schema, modellookup, session=None):
+    """async version of apply_changes(), the collections are loaded before"""
+    return await run_preloaded(
+        session, [ob], schema, lambda: apply_changes(ob, params, schema, modellookup)
+    )
+
+
+async def astream(
+    session,
+    stmt,
+    plan,
+    options=(),
+    verbose=False,
+    chunksize=DEFAULT_CHUNKSIZE,
+    memoize=True,
+):
+    """async generator, stmt (select()) is executed and jsonified chunk by chunk"""
+    marker_ = marker if verbose else None
+    stmt = stmt.options(*options).execution_options(yield_per=chunksize)
+    result = await session.stream_scalars(stmt)
+    async for chunk in result.partitions(chunksize):
+        memo = Memo() if memoize else None  # for each chunk, for memory
+        rows = await session.run_sync(lambda _: plan.fold_many(chunk, marker_, memo))
+        for row in rows:
+            yield row
@@ -0,0 +1,174 @@
+# -*- coding:utf-8 -*-
+"""
+prebuilt schemas (bundle file) -> mappings, without running SchemaFactory at startup
+
+    # at build time
+    registry = MappingRegistry(mapping_factory)
+    registry.register(models.User)
+    registry.register(models.Group, excludes=["users"])
+    registry.save("schemas.bundle.json")
+
+    # at startup
+    registry = MappingRegistry.load("schemas.bundle.json", mapping_factory)
+    registry[models.User].jsondict_from_object(user)
+
+each entry holds the fingerprint of the model and its related models;
+if it does not match the current definition, the schema is regenerated.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from importlib import import_module
+from .fingerprint import fingerprint, related_models, model_path, VERSION
+
+
+def import_model(path):
+    """'<module>:<qualname>' -> model"""
+    module_name, _, qualname = path.partition(":")
+    ob = import_module(module_name)
+    for name in qualname.split("."):
+        ob = getattr(ob, name)
+    return ob
+
+
+def bundle_fingerprint(model, cache=None):
+    """fingerprint of the model and all models reachable by relationships"""
+    if cache is None:
+        cache = {}
+    digests = []
+    for m in related_models([model]):
+        if m not in cache:
+            cache[m] = fingerprint(m)
+        digests.append("{}={}".format(model_path(m), cache[m]))
+    return hashlib.sha1("\n".join(sorted(digests)).encode("utf-8")).hexdigest()
+
+
+def describe_factory(schema_factory):
+    """generation options, which are not a part of each entry"""
+    return {
+        "walker": model_path(schema_factory.walker),
+        "decision": model_path(schema_factory.relation_decision.__class__),
+        "child_factory": model_path(schema_factory.child_factory.__class__),
+    }
+
+
+class BundledModule(object):
+    """module like object for ModelLookup, model name -> model (imported by path)"""
+
+    def __init__(self, paths):
+        self.paths = paths  # model name -> model path
+        self.models = {}
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        models = self.__dict__["models"]
+        if name not in models:
+            try:
+                path = self.__dict__["paths"][name]
+            except KeyError:
+                raise AttributeError(name)
+            models[name] = import_model(path)
+        return models[name]
+
+
+class MappingRegistry(object):
+    def __init__(self, mapping_factory):
+        self.mapping_factory = mapping_factory
+        self.mappings = {}  # model -> Mapping
+        self.entries = {}  # model -> {model, fingerprint, options, schema}
+        self.regenerated = []  # models, not loaded from the bundle
+        self.module = BundledModule({})
+        self._fingerprints = {}
+
+    def __getitem__(self, model):
+        return self.mappings[model]
+
+    def __contains__(self, model):
+        return model in self.mappings
+
+    def __iter__(self):
+        return iter(self.mappings)
+
+    def __len__(self):
+        return len(self.mappings)
+
+    def register(self, model, includes=None, excludes=None, depth=None):
+        options = {"includes": includes, "excludes": excludes, "depth": depth}
+        schema = self.mapping_factory.schema_factory(model, **options)
+        return self._add(model, schema, options)
+
+    def _add(self, model, schema, options):
+        self.module.paths[model.__name__] = model_path(model)
+        self.module.models[model.__name__] = model
+        self.entries[model] = {
+            "model": model_path(model),
+            "fingerprint": bundle_fingerprint(model, cache=self._fingerprints),
+            "options": options,
+            "schema": schema,
+        }
+        mapping = self.mappings[model] = self.mapping_factory.from_schema(
+            model, schema, module=self.module
+        )
+        return mapping
+
+    def dump(self):
+        return {
+            "version": VERSION,
+            "factory": describe_factory(self.mapping_factory.schema_factory),
+            "models": self.module.paths,
+            "entries": [self.entries[model] for model in self.mappings],
+        }
+
+    def save(self, filename):
+        # written atomically, the bundle may be read by other processes
+        dirname = os.path.dirname(os.path.abspath(filename))
+        fd, tmpname = tempfile.mkstemp(dir=dirname, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as wf:
+                json.dump(self.dump(), wf, sort_keys=True)
+            os.replace(tmpname, filename)
+        except BaseException:
+            os.unlink(tmpname)
+            raise
+
+    @classmethod
+    def load(cls, filename, mapping_factory, models=None):
+        """load bundle file. if models are passed, missing ones are registered"""
+        registry = cls(mapping_factory)
+        try:
+            with open(filename) as rf:
+                data = json.load(rf)
+        except (IOError, ValueError):
+            data = {}
+        registry.restore(data)
+
+        for model in models or []:
+            if model not in registry:
+                registry.register(model)
+                registry.regenerated.append(model)
+        return registry
+
+    def restore(self, data):
+        if data.get("version") != VERSION or data.get("factory") != describe_factory(
+            self.mapping_factory.schema_factory
+        ):
+            return
+
+        self.module.paths.update(data["models"])
+        for entry in data["entries"]:
+            try:
+                model = import_model(entry["model"])
+            except (ImportError, AttributeError):  # removed
+                continue
+
+            options = entry["options"]
+            if entry["fingerprint"] == bundle_fingerprint(
+                model, cache=self._fingerprints
+            ):
+                self._add(model, entry["schema"], options)
+            else:
+                self.register(model, **options)
+                self.regenerated.append(model)
@@ -0,0 +1,63 @@
+import json
+import os.path
+from copy import deepcopy
+from alchemyjsonschema.fingerprint import (
+    fingerprint,
+    related_models,
+    model_path,
+    VERSION,
+)
+
+
+class DefinitionsCache:
+    """on-disk cache of definitions, keyed by the fingerprint of each model"""
+
+    def __init__(self, filename, options):
+        self.filename = filename
+        self.options = options  # generation options (walker, decision, ...)
+        self.entries = {}  # model path -> {fingerprint, schema, referenced}
+        self.built = []  # models, (re)built at this time
+
+    def load(self, models):
+        """models -> dict for reuse (model -> (schema, referenced models))"""
+        try:
+            with open(self.filename) as rf:
+                data = json.load(rf)
+        except (IOError, ValueError):
+            return {}
+        if data.get("version") != VERSION or data.get("options") != self.options:
+            return {}
+
+        candidates = {model_path(m): m for m in related_models(models)}
+        reuse = {}
+        for path, entry in data["entries"].items():
+            model = candidates.get(path)
+            if model is None or entry["fingerprint"] != fingerprint(model):
+                continue
+            if not all(name in candidates for name in entry["referenced"]):
+                continue
+            referenced = [candidates[name] for name in entry["referenced"]]
+            reuse[model] = (deepcopy(entry["schema"]), referenced)
+            self.entries[path] = entry
+        return reuse
+
+    def add(self, model, schema, referenced):
+        path = model_path(model)
+        if path in self.entries:
+            return
+        self.built.append(model)
+        self.entries[path] = {
+            "fingerprint": fingerprint(model),
+            "schema": deepcopy(schema),
+            "referenced": [model_path(m) for m in referenced],
+        }
+
+    def save(self):
+        data = {"version": VERSION, "options": self.options, "entries": self.entries}
+        with open(self.filename, "w") as wf:
+            json.dump(data, wf, sort_keys=True)
+
+
+def cache_filename(filename):
+    dirname, basename = os.path.split(filename)
+    return os.path.join(dirname, ".{}.cache.json".format(basename))
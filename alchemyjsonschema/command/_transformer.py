@@ -1,12 +1,11 @@
 import inspect
-from dictknife import DictWalker
 
 
 class JSONSchemaTransformer:
     def __init__(self, schema_factory):
         self.schema_factory = schema_factory
 
-    def transform(self, rawtarget, depth):
+    def transform(self, rawtarget, depth, executor=None, cache=None):
         if not inspect.isclass(rawtarget):
             raise RuntimeError(
                 "please passing the path of model class (e.g. foo.boo:Model)"
@@ -18,11 +17,13 @@ class OpenAPI2Transformer:
     def __init__(self, schema_factory):
         self.schema_factory = schema_factory
 
-    def transform(self, rawtarget, depth):
+    def transform(self, rawtarget, depth, executor=None, cache=None):
         if inspect.isclass(rawtarget):
             return self.transform_by_model(rawtarget, depth)
         else:
-            return self.transform_by_module(rawtarget, depth)
+            return self.transform_by_module(
+                rawtarget, depth, executor=executor, cache=cache
+            )
 
     def transform_by_model(self, model, depth):
         definitions = {}
@@ -32,17 +33,22 @@ class OpenAPI2Transformer:
         definitions[schema["title"]] = schema
         return {"definitions": definitions}
 
-    def transform_by_module(self, module, depth):
-        subdefinitions = {}
+    def transform_by_module(self, module, depth, executor=None, cache=None):
+        # each model is visited once, and connected by $ref
+        models = collect_models(module)
+        kwargs = {}
+        if executor is not None:
+            kwargs["map"] = executor.map
+        if cache is not None:
+            kwargs["reuse"] = cache.load(models)
+
         definitions = {}
-        for basemodel in collect_models(module):
-            schema = self.schema_factory(basemodel, depth=depth)
-            if "definitions" in schema:
-                subdefinitions.update(schema.pop("definitions"))
+        for model, schema, referenced in self.schema_factory.iterate_definitions(
+            models, depth=depth, **kwargs
+        ):
             definitions[schema["title"]] = schema
-        d = {}
-        d.update(subdefinitions)
-        d.update(definitions)
+            if cache is not None:
+                cache.add(model, schema, referenced)
         return {"definitions": definitions}
 
 
@@ -51,8 +57,12 @@ class OpenAPI3Transformer:
         self.schema_factory = schema_factory
         self.oas2transformer = OpenAPI2Transformer(schema_factory)
 
-    def transform(self, rawtarget, depth):
-        d = self.oas2transformer.transform(rawtarget, depth)
+    def transform(self, rawtarget, depth, executor=None, cache=None):
+        from dictknife import DictWalker
+
+        d = self.oas2transformer.transform(
+            rawtarget, depth, executor=executor, cache=cache
+        )
         for _, sd in DictWalker(["$ref"]).walk(d):
             sd["$ref"] = sd["$ref"].replace("#/definitions/", "#/components/schemas/")
         if "components" not in d:
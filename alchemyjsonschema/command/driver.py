@@ -1,8 +1,8 @@
-import magicalimport
-from dictknife import loading
+from concurrent.futures import ProcessPoolExecutor
 from alchemyjsonschema import SchemaFactory
 from alchemyjsonschema import StructuralWalker, NoForeignKeyWalker, ForeignKeyWalker
 from alchemyjsonschema import RelationDesicion, UseForeignKeyIfPossibleDecision
+from ._cache import DefinitionsCache, cache_filename
 from ._transformer import (
     JSONSchemaTransformer,
     OpenAPI2Transformer,
@@ -42,28 +42,58 @@ def detect_transformer(layout):
 
 
 class Driver:
-    def __init__(self, walker, decision, layout):
+    def __init__(self, walker, decision, layout, observer=None):
+        self.options = {"walker": walker, "decision": decision}
+        self.observer = observer
         self.transformer = self.build_transformer(walker, decision, layout)
 
     def build_transformer(self, walker, decision, layout):
         walker_factory = detect_walker_factory(walker)
         relation_decision = detect_decision(decision)
         schema_factory = SchemaFactory(
-            walker_factory, relation_decision=relation_decision
+            walker_factory, relation_decision=relation_decision, observer=self.observer
         )
         transformer_factory = detect_transformer(layout)
         return transformer_factory(schema_factory).transform
 
-    def run(self, module_path, filename, format, depth=None):
+    def run(self, module_path, filename, format, depth=None, jobs=1, incremental=False):
         data = self.load(module_path)
-        result = self.transformer(data, depth=depth)
+        kwargs = {}
+        if incremental and filename is not None:
+            options = dict(self.options, depth=depth)
+            kwargs["cache"] = DefinitionsCache(cache_filename(filename), options)
+
+        if jobs > 1:
+            with self.build_executor(module_path, jobs) as executor:
+                result = self.transformer(
+                    data, depth=depth, executor=executor, **kwargs
+                )
+        else:
+            result = self.transformer(data, depth=depth, **kwargs)
         self.dump(result, filename, format=format)
 
+        if "cache" in kwargs:
+            kwargs["cache"].save()
+
+    def build_executor(self, module_path, jobs):
+        # the models are imported in each worker process, too
+        return ProcessPoolExecutor(
+            max_workers=jobs, initializer=load, initargs=(module_path,)
+        )
+
     def dump(self, data, filename, format):
+        from dictknife import loading
+
         loading.dumpfile(data, filename, format=format, sort_keys=True)
 
     def load(self, module_path):
-        if ":" in module_path:
-            return magicalimport.import_symbol(module_path, cwd=True)
-        else:
-            return magicalimport.import_module(module_path, cwd=True)
+        return load(module_path)
+
+
+def load(module_path):
+    import magicalimport
+
+    if ":" in module_path:
+        return magicalimport.import_symbol(module_path, cwd=True)
+    else:
+        return magicalimport.import_module(module_path, cwd=True)
@@ -0,0 +1,236 @@
+"""
+alchemyjsonschema dump <model> <url> (rows -> ndjson)
+
+    $ alchemyjsonschema dump models.py:User sqlite:///app.db --out users.ndjson.gz --gzip --jobs 4
+
+with --jobs, the table is split by the ranges of primary key, and each
+worker process dumps its ranges with its own connection. the parts are
+concatenated in order (concatenated gzip members are also a gzip file).
+"""
+
+import argparse
+import gzip
+import os
+import shutil
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+DEFAULT_CHUNKSIZE = 1000
+PARTITIONS_PER_JOB = 4  # for balancing, the ranges are not evenly filled
+COMPRESSLEVEL = 6
+
+
+class PartitionError(ValueError):
+    pass
+
+
+class Dumper:
+    def __init__(
+        self,
+        walker="structural",
+        decision="default",
+        depth=None,
+        verbose=False,
+        chunksize=DEFAULT_CHUNKSIZE,
+        encoder=None,
+    ):
+        # only plain values, this is passed to the worker processes
+        self.walker = walker
+        self.decision = decision
+        self.depth = depth
+        self.verbose = verbose
+        self.chunksize = chunksize
+        self.encoder = encoder
+
+    def build_plan(self, model):
+        from alchemyjsonschema import SchemaFactory
+        from alchemyjsonschema.dictify import compile_jsonify, jsonify_dict
+        from alchemyjsonschema.loading import loader_options
+        from .driver import detect_walker_factory, detect_decision
+
+        schema_factory = SchemaFactory(
+            detect_walker_factory(self.walker),
+            relation_decision=detect_decision(self.decision),
+        )
+        schema = schema_factory(model, depth=self.depth)
+        return compile_jsonify(schema, registry=jsonify_dict), loader_options(
+            model, schema
+        )
+
+    def run(self, model_path, url, filename=None, jobs=1, compress=False):
+        from .driver import load
+
+        model = load(model_path)
+        if jobs > 1:
+            ranges = self.split(model, url, jobs * PARTITIONS_PER_JOB)
+            self.run_parallel(model_path, url, ranges, filename, jobs, compress)
+            return
+
+        with _open(filename, compress) as wf:
+            self.dump(model, url, wf)
+
+    def dump(self, model, url, wf, lo=None, hi=None):
+        """rows -> ndjson, (lo <= primary key < hi, if passed)"""
+        import sqlalchemy as sa
+        from sqlalchemy.orm import Session
+        from alchemyjsonschema.dictify import Memo, marker
+        from alchemyjsonschema.encoder import get_encoder
+
+        plan, options = self.build_plan(model)
+        dumps = get_encoder(self.encoder).dumps
+        marker_ = marker if self.verbose else None
+
+        pk = _primary_key(model)
+        stmt = sa.select(model).options(*options).order_by(*pk)
+        if lo is not None:
+            stmt = stmt.where(pk[0] >= lo, pk[0] < hi)
+        stmt = stmt.execution_options(yield_per=self.chunksize)
+
+        engine = sa.create_engine(url)
+        try:
+            with Session(engine) as session:
+                for chunk in session.scalars(stmt).partitions():
+                    # memoized in the chunk (not for the whole table, for memory)
+                    rows = plan.fold_many(chunk, marker_, Memo(share=True))
+                    wf.write(b"".join([dumps(row) + b"\n" for row in rows]))
+        finally:
+            engine.dispose()
+
+    def split(self, model, url, n):
+        """-> [(lo, hi)], the ranges of primary key (integer only)"""
+        import sqlalchemy as sa
+
+        pk = _primary_key(model)
+        if len(pk) != 1 or pk[0].type.python_type is not int:
+            raise PartitionError(
+                "--jobs requires single integer primary key, {} has {}".format(
+                    model.__name__, [c.name for c in pk]
+                )
+            )
+
+        engine = sa.create_engine(url)
+        try:
+            with engine.connect() as conn:
+                stmt = sa.select(sa.func.min(pk[0]), sa.func.max(pk[0]))
+                lo, hi = conn.execute(stmt).one()
+        finally:
+            engine.dispose()
+        if lo is None:  # empty table
+            return []
+
+        hi += 1
+        step = max(1, -(-(hi - lo) // n))  # ceil
+        return [(i, min(i + step, hi)) for i in range(lo, hi, step)]
+
+    def run_parallel(self, model_path, url, ranges, filename, jobs, compress):
+        dirname = os.path.dirname(os.path.abspath(filename)) if filename else None
+        with tempfile.TemporaryDirectory(dir=dirname) as tmpdir:
+            parts = [
+                os.path.join(tmpdir, "part{:05d}".format(i)) for i in range(len(ranges))
+            ]
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                futures = [
+                    executor.submit(
+                        dump_partition, self, model_path, url, lo, hi, part, compress
+                    )
+                    for (lo, hi), part in zip(ranges, parts)
+                ]
+                for fut in futures:
+                    fut.result()
+
+            # the parts are already compressed, so they are concatenated as is
+            with _open(filename, False) as wf:
+                for part in parts:
+                    with open(part, "rb") as rf:
+                        shutil.copyfileobj(rf, wf)
+
+
+def dump_partition(dumper, model_path, url, lo, hi, filename, compress):
+    # in worker process
+    from .driver import load
+
+    with _open(filename, compress) as wf:
+        dumper.dump(load(model_path), url, wf, lo=lo, hi=hi)
+
+
+def _primary_key(model):
+    import sqlalchemy as sa
+
+    return list(sa.inspect(model).primary_key)
+
+
+class _open:
+    # filename is None -> stdout (not closed)
+    def __init__(self, filename, compress):
+        self.filename = filename
+        self.compress = compress
+        self.fp = None
+        self.wf = None
+
+    def __enter__(self):
+        if self.filename is None:
+            self.wf = sys.stdout.buffer
+        else:
+            self.wf = self.fp = open(self.filename, "wb")
+        if self.compress:
+            self.wf = gzip.GzipFile(
+                fileobj=self.wf, mode="wb", compresslevel=COMPRESSLEVEL, mtime=0
+            )
+        return self.wf
+
+    def __exit__(self, typ, val, tb):
+        if self.compress:
+            self.wf.close()
+        if self.fp is not None:
+            self.fp.close()
+        else:
+            sys.stdout.buffer.flush()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="alchemyjsonschema dump", description="dump rows as ndjson"
+    )
+    parser.add_argument("target", help="the model class (e.g. models.py:User)")
+    parser.add_argument("url", help="the database url")
+    parser.add_argument("--out", default=None, help="output to file")
+    parser.add_argument("--gzip", action="store_true", help="gzip compressed")
+    parser.add_argument(
+        "--jobs",
+        default=1,
+        type=int,
+        help="the number of processes (split by the ranges of primary key)",
+    )
+    parser.add_argument(
+        "--walker",
+        choices=["noforeignkey", "foreignkey", "structural"],
+        default="structural",
+    )
+    parser.add_argument(
+        "--decision", choices=["default", "useforeignkey"], default="default"
+    )
+    parser.add_argument("--depth", default=None, type=int)
+    parser.add_argument(
+        "--verbose", action="store_true", help="including null attributes"
+    )
+    parser.add_argument("--chunksize", default=DEFAULT_CHUNKSIZE, type=int)
+    parser.add_argument(
+        "--encoder", choices=["json", "orjson"], default=None, help="auto detected"
+    )
+    args = parser.parse_args(argv)
+    if ":" not in args.target:
+        parser.error("target must be a model class (e.g. models.py:User)")
+
+    dumper = Dumper(
+        args.walker,
+        args.decision,
+        depth=args.depth,
+        verbose=args.verbose,
+        chunksize=args.chunksize,
+        encoder=args.encoder,
+    )
+    try:
+        dumper.run(args.target, args.url, args.out, jobs=args.jobs, compress=args.gzip)
+    except PartitionError as e:
+        parser.error(str(e))
@@ -1,9 +1,17 @@
 import argparse
-from magicalimport import import_symbol
+import sys
 
 
-def main():
-    parser = argparse.ArgumentParser()
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["dump"]:
+        from .dump import main as dump_main
+
+        return dump_main(argv[1:])
+
+    parser = argparse.ArgumentParser(
+        epilog="rows as ndjson: alchemyjsonschema dump --help"
+    )
     parser.add_argument("target", help="the module or class to extract schemas from")
     parser.add_argument("--format", default=None, choices=["json", "yaml"])
     parser.add_argument(
@@ -16,14 +24,47 @@ def main():
     )
     parser.add_argument("--depth", default=None, type=int)
     parser.add_argument("--out", default=None, help="output to file")
+    parser.add_argument(
+        "--jobs", default=1, type=int, help="the number of processes for generation"
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="rebuild only changed models (the cache file is saved next to --out)",
+    )
     parser.add_argument(
         "--layout",
         choices=["swagger2.0", "jsonschema", "openapi3.0", "openapi2.0"],
         default="swagger2.0",
     )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="print the cost of each model (to stderr)",
+    )
     parser.add_argument("--driver", default="alchemyjsonschema.command.driver:Driver")
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+    if args.incremental and args.out is None:
+        parser.error("--incremental requires --out")
+    if args.profile and args.jobs > 1:
+        parser.error("--profile cannot be used with --jobs")
+
+    # imported after parsing, for fast --help
+    from magicalimport import import_symbol
 
     driver_cls = import_symbol(args.driver, cwd=True)
-    driver = driver_cls(args.walker, args.decision, args.layout)
-    driver.run(args.target, args.out, format=args.format)
+    kwargs = {}
+    if args.profile:
+        from alchemyjsonschema.observer import CostCollector
+
+        kwargs["observer"] = CostCollector()
+    driver = driver_cls(args.walker, args.decision, args.layout, **kwargs)
+    driver.run(
+        args.target,
+        args.out,
+        format=args.format,
+        jobs=args.jobs,
+        incremental=args.incremental,
+    )
+    if args.profile:
+        kwargs["observer"].report()
@@ -1,18 +1,20 @@
 # -*- coding:utf-8 -*-
 import logging
+import threading
+from collections import OrderedDict
 
 logger = logging.getLogger(__name__)
 from sqlalchemy.inspection import inspect
 from sqlalchemy.orm.relationships import RelationshipProperty
+from sqlalchemy.engine import Row, RowMapping
 from functools import partial
-import isodate
-from .custom.format import (
+from itertools import islice
+from datetime import timezone
+from .custom.parsing import (
     parse_time,  # more strict than isodate
     parse_date,  # more strict
 )
-from jsonschema import validate
 from . import InvalidStatus
-import pytz
 
 
 class ConvertionError(Exception):
@@ -24,7 +26,13 @@ class ConvertionError(Exception):
 def datetime_rfc3339(ob):
     if ob.tzinfo:
         return ob.isoformat()
-    return pytz.utc.localize(ob).isoformat()
+    return ob.replace(tzinfo=timezone.utc).isoformat()
+
+
+def parse_datetime(s):
+    import isodate  # imported lazily (slow to import)
+
+    return isodate.parse_datetime(s)
 
 
 def isoformat(ob):
@@ -39,15 +47,45 @@ def raise_error(ob):
     raise Exception("convert failure. unknown format xxx of {}".format(ob))
 
 
+# column converters (values -> converted values), used by batch conversion.
+# values are not None. if not found, the converter is mapped one by one.
+def datetime_rfc3339_column(values):
+    # same as datetime_rfc3339(), without building new datetime objects
+    return [ob.isoformat() if ob.tzinfo else ob.isoformat() + "+00:00" for ob in values]
+
+
+def isoformat_column(values):
+    return [ob.isoformat() + "Z" for ob in values]
+
+
+def isoformat0_column(values):
+    return [ob.isoformat() for ob in values]
+
+
+jsonify_column_dict = {
+    datetime_rfc3339: datetime_rfc3339_column,
+    isoformat: isoformat_column,
+    isoformat0: isoformat0_column,
+}
+
+
 def maybe_wrap(fn, default=None):
     def wrapper(ob):
         if ob is None:
             return default
         return fn(ob)
 
+    # compiled plans call fn directly, and the None check is inlined.
+    # (not `__wrapped__`, it is also set by functools.wraps(), lru_cache(), ...)
+    wrapper._maybe_wrap = (fn, default)
     return wrapper
 
 
+def unwrap_maybe(fn):
+    """-> (fn, default) if fn is maybe_wrap()ed, else None"""
+    return getattr(fn, "_maybe_wrap", None)
+
+
 # todo: look at required or not
 jsonify_dict = {
     ("string", None): maybe_wrap(str),
@@ -68,7 +106,7 @@ normalize_dict = {
     ("number", None): maybe_wrap(float),
     ("integer", None): maybe_wrap(int),
     ("boolean", None): maybe_wrap(bool),
-    ("string", "date-time"): maybe_wrap(isodate.parse_datetime),
+    ("string", "date-time"): maybe_wrap(parse_datetime),
     ("string", "date"): maybe_wrap(parse_date),
     ("xxx", None): raise_error,
 }
@@ -197,6 +235,8 @@ def dictify(ob, schema, convert=attribute_of):
 
 def jsonify(ob, schema, convert=jsonify_of, registry=jsonify_dict, verbose=False):
     # if verbose option is True, response has None value attributes.
+    if isinstance(ob, (Row, RowMapping)):
+        return jsonify_row(ob, schema, registry=registry, verbose=verbose)
     _marker = marker if verbose else None
     return DictWalker(schema, convert, getattr, registry=registry, marker=_marker)(ob)
 
@@ -209,6 +249,450 @@ def prepare(ob, schema, convert=prepare_of, registry=prepare_dict):
     return DictWalker(schema, convert, dict.get, registry=registry)(ob)
 
 
+def as_row_mapping(row):
+    if isinstance(row, Row):
+        return row._mapping
+    return row
+
+
+def label_prefixes(keys, separator="."):
+    """e.g. ["group.pk", "group.owner.pk"] -> {"group.", "group.owner."}"""
+    r = set()
+    for k in keys:
+        if not isinstance(k, str):
+            continue
+        i = k.find(separator)
+        while i >= 0:
+            r.add(k[: i + len(separator)])
+            i = k.find(separator, i + 1)
+    return frozenset(r)
+
+
+_EMPTY_PREFIXES = frozenset()
+
+
+# compiled plans
+DEFAULT_CHUNKSIZE = 100
+SCALAR = 0
+NULLABLE = 1  # maybe_wrap()ed converter, None check is inlined
+OBJECT = 2
+ARRAY = 3
+
+
+def identity_of(ob):
+    # identity key of mapped object (including the class), or id() if transient
+    state = getattr(ob, "_sa_instance_state", None)
+    if state is not None and state.key is not None:
+        return state.key
+    return id(ob)
+
+
+class Memo(dict):
+    """id(plan) -> {identity key -> jsondict}, used by JsonifyPlan.fold_many()
+
+    if share is False, a reused jsondict is copied (the results are safe to
+    modify). if True, the same jsondict is shared (e.g. encoded at once).
+    """
+
+    def __init__(self, share=False):
+        super().__init__()
+        self.share = share
+        self.transients = []  # keeping alive, for the keys by id()
+
+
+class JsonifyPlan(object):
+    """flat serializer plan for a properties dict, see: compile_jsonify()"""
+
+    def __init__(self, column_registry=jsonify_column_dict):
+        self.fields = []  # [(name, kind, converter or sub plan, default)]
+        self.column_registry = column_registry  # converter -> column converter
+        self._nested_fields = None
+
+    def __call__(self, ob, verbose=False):
+        # if verbose option is True, response has None value attributes.
+        return self.fold(ob, marker if verbose else None)
+
+    def fold(self, ob, marker):
+        if ob is None:
+            return None
+        D = {}
+        for name, kind, v, default in self.fields:
+            if kind == NULLABLE:
+                val = getattr(ob, name, None)
+                val = default if val is None else v(val)
+            elif kind == SCALAR:
+                val = v(getattr(ob, name, None))
+            elif kind == ARRAY:
+                val = [v.fold(e, marker) for e in getattr(ob, name, [])]
+            else:
+                val = v.fold(getattr(ob, name), marker)
+            if val is not marker:
+                D[name] = val
+        return D
+
+    def iterate(
+        self, obs, verbose=False, chunksize=DEFAULT_CHUNKSIZE, memoize=True, share=False
+    ):
+        """jsonify objects chunk by chunk (obs can be a generator)
+
+        if memoize is True, the related objects referenced repeatedly
+        (e.g. many-to-one) are converted only once in each chunk (see: Memo).
+        the memo is not kept over the chunks, for memory.
+        """
+        marker_ = marker if verbose else None
+        it = iter(obs)
+        while True:
+            chunk = list(islice(it, chunksize))
+            if not chunk:
+                return
+            memo = Memo(share=share) if memoize else None
+            yield from self.fold_many(chunk, marker_, memo)
+
+    def fold_row(self, row, marker, prefixes, prefix="", separator="."):
+        # row is mapping (e.g. RowMapping), nested object is found by labels.
+        # e.g. {"name": "foo", "group.name": "bar"} -> {"name": "foo", "group": {"name": "bar"}}
+        D = {}
+        found = False
+        for name, kind, v, default in self.fields:
+            key = prefix + name
+            val = row.get(key)
+            if kind == NULLABLE:
+                val, present = _row_nullable(v, val, default)
+            elif kind == SCALAR:
+                val, present = v(val), val is not None
+            elif kind == ARRAY:  # e.g. json_agg()
+                val, present = _row_array(v, val, marker)
+            else:
+                val, present = _row_object(
+                    v, val, row, key, marker, prefixes, separator
+                )
+            found = found or present
+            if val is not marker:
+                D[name] = val
+        if prefix and not found:  # e.g. outer join, and not matched
+            return None
+        return D
+
+    def iterate_rows(self, rows, verbose=False, separator="."):
+        """jsonify rows (Result, or iterable of Row or RowMapping)"""
+        marker_ = marker if verbose else None
+        prefixes = None
+        if hasattr(rows, "mappings"):  # Result
+            prefixes = label_prefixes(rows.keys(), separator=separator)
+            rows = rows.mappings()
+        for row in rows:
+            row = as_row_mapping(row)
+            if prefixes is None:
+                prefixes = label_prefixes(row.keys(), separator=separator)
+            yield self.fold_row(row, marker_, prefixes, separator=separator)
+
+    def fold_many(self, obs, marker, memo=None):
+        # column by column, values of each column are converted at once
+        if not obs:
+            return []
+        rows = [None if ob is None else {} for ob in obs]
+        targets = [ob for ob in obs if ob is not None]
+        if not targets:  # all None, and not recursing (e.g. recursive definitions)
+            return rows
+        dicts = [D for D in rows if D is not None]
+        for name, kind, v, default in self.fields:
+            if kind == NULLABLE:
+                values = self._many_nullable(targets, name, v, default)
+            elif kind == SCALAR:
+                values = list(map(v, [getattr(ob, name, None) for ob in targets]))
+            elif kind == ARRAY:
+                values = self._many_array(targets, name, v, marker, memo)
+            else:
+                subs = [getattr(ob, name) for ob in targets]
+                values = _fold_many(v, subs, marker, memo)
+            for D, val in zip(dicts, values):
+                if val is not marker:
+                    D[name] = val
+        return rows
+
+    def _many_nullable(self, obs, name, v, default):
+        values = [getattr(ob, name, None) for ob in obs]
+        present = [val for val in values if val is not None]
+        convert_column = self.column_registry.get(v)
+        if convert_column is None:
+            converted = iter(list(map(v, present)))
+        else:
+            converted = iter(convert_column(present))
+        return [default if val is None else next(converted) for val in values]
+
+    def _many_array(self, obs, name, v, marker, memo):
+        children = [list(getattr(ob, name, [])) for ob in obs]
+        flatten = [e for es in children for e in es]
+        folded = iter(_fold_many(v, flatten, marker, memo))
+        return [[next(folded) for _ in es] for es in children]
+
+    def fold_memoized(self, obs, marker, memo):
+        # fold_many(), but each object is converted once (see: Memo)
+        table = memo.get(id(self))
+        if table is None:
+            table = memo[id(self)] = {}
+        keys = [None if ob is None else identity_of(ob) for ob in obs]
+        pending = {}  # converted in this call, the first one is not copied
+        for k, ob in zip(keys, obs):
+            if k is not None and k not in table and k not in pending:
+                pending[k] = ob
+                if k.__class__ is int:
+                    memo.transients.append(ob)
+        if pending:
+            table.update(
+                zip(pending, self.fold_many(list(pending.values()), marker, memo))
+            )
+
+        if memo.share:
+            return [None if k is None else table[k] for k in keys]
+
+        rows = []
+        for k in keys:
+            if k is None:
+                rows.append(None)
+            elif k in pending:
+                del pending[k]
+                rows.append(table[k])
+            else:
+                rows.append(self.copy(table[k]))
+        return rows
+
+    def copy(self, D):
+        """copy the jsondict (only the dicts and lists built by this plan)"""
+        if self._nested_fields is None:
+            self._nested_fields = [
+                (name, kind, v)
+                for name, kind, v, _ in self.fields
+                if kind in (OBJECT, ARRAY)
+            ]
+        D = dict(D)
+        for name, kind, v in self._nested_fields:
+            val = D.get(name)
+            if val is None:
+                continue
+            if kind == ARRAY:
+                D[name] = [None if e is None else v.copy(e) for e in val]
+            else:
+                D[name] = v.copy(val)
+        return D
+
+
+def _fold_many(plan, obs, marker, memo):
+    if memo is None:
+        return plan.fold_many(obs, marker)
+    return plan.fold_memoized(obs, marker, memo)
+
+
+# the values of fold_row(), -> (value, found)
+def _row_nullable(v, val, default):
+    if val is None:
+        return default, False
+    return v(val), True
+
+
+def _row_array(v, val, marker):
+    if val is None:  # not selected (or null), [] if verbose, as JsonifyPlan.fold()
+        return ([] if marker is not None else None), False
+    return [v.fold_row(e, marker, _EMPTY_PREFIXES) for e in val], True
+
+
+def _row_object(v, val, row, key, marker, prefixes, separator):
+    if val is not None:  # e.g. json_build_object()
+        val = v.fold_row(val, marker, _EMPTY_PREFIXES)
+    elif key + separator in prefixes:
+        val = v.fold_row(row, marker, prefixes, key + separator, separator=separator)
+    return val, val is not None
+
+
+class NormalizePlan(object):
+    """flat normalize pipeline for a properties dict, see: compile_normalize()"""
+
+    def __init__(self):
+        self.fields = []  # [(name, kind, converter or sub plan, default)]
+
+    def __call__(self, params):
+        return self.fold(params)
+
+    def fold(self, params):
+        if params is None:
+            return None
+        D = {}
+        get = params.get
+        try:
+            for name, kind, v, default in self.fields:
+                if kind == NULLABLE:
+                    val = get(name, marker)
+                    if val is not marker:
+                        D[name] = default if val is None else v(val)
+                elif kind == SCALAR:
+                    val = get(name, marker)
+                    if val is not marker:
+                        D[name] = v(val)
+                elif kind == ARRAY:
+                    D[name] = [v.fold(e) for e in get(name, [])]
+                else:
+                    D[name] = v.fold(get(name))
+        except ValueError as e:
+            raise ConvertionError(name, e.args[0])
+        return D
+
+
+def passthrough(ob):
+    return ob
+
+
+class PlanCompiler(object):
+    plan_class = None
+
+    def __init__(self, schema, registry):
+        self.schema = schema
+        self.registry = registry
+        self.plans = {}  # id(properties) -> plan, also for recursive definitions
+
+    def __call__(self):
+        return self.compile_properties(self.get_properties(self.schema))
+
+    def compile_properties(self, properties):
+        plan = self.plans.get(id(properties))
+        if plan is not None:
+            return plan
+        plan = self.plans[id(properties)] = self.make_plan()
+        for name, schema in properties.items():
+            plan.fields.append(self.compile_property(name, schema))
+        return plan
+
+    def make_plan(self):
+        return self.plan_class()
+
+    def compile_property(self, name, schema):
+        type_ = schema.get("type")
+        if type_ in ("array", "object") and not _has_substructure(schema):
+            # e.g. JSON column, the value is used as is
+            return (name, SCALAR, passthrough, None)
+        elif type_ == "array":
+            subplan = self.compile_properties(self.get_properties(schema))
+            return (name, ARRAY, subplan, None)
+        elif type_ is None or type_ == "object":
+            subplan = self.compile_properties(self.get_properties(schema))
+            return (name, OBJECT, subplan, None)
+        else:
+            convert_fn = self.lookup(name, (type_, schema.get("format")))
+            wrapped = unwrap_maybe(convert_fn)
+            if wrapped is not None:
+                return (name, NULLABLE, wrapped[0], wrapped[1])
+            return (name, SCALAR, convert_fn, None)
+
+    def lookup(self, name, type_):
+        try:
+            return self.registry[type_]
+        except (KeyError, TypeError):
+
+            def convert_fn(ob):
+                raise ConvertionError(
+                    name,
+                    "convert {} failure. unknown format {} of {}".format(
+                        name, type_, ob
+                    ),
+                )
+
+            return convert_fn
+
+    def get_properties(self, schema):
+        return get_properties(schema, self.schema)
+
+
+class JsonifyCompiler(PlanCompiler):
+    plan_class = JsonifyPlan
+
+    def __init__(
+        self, schema, registry=jsonify_dict, column_registry=jsonify_column_dict
+    ):
+        super().__init__(schema, registry)
+        self.column_registry = column_registry
+
+    def make_plan(self):
+        return self.plan_class(column_registry=self.column_registry)
+
+
+class NormalizeCompiler(PlanCompiler):
+    plan_class = NormalizePlan
+
+    def __init__(self, schema, registry=normalize_dict):
+        super().__init__(schema, registry)
+
+
+def _has_substructure(schema):
+    return "properties" in schema or "items" in schema or "$ref" in schema
+
+
+def compile_jsonify(schema, registry=jsonify_dict, column_registry=jsonify_column_dict):
+    return JsonifyCompiler(schema, registry=registry, column_registry=column_registry)()
+
+
+def compile_normalize(schema, registry=normalize_dict):
+    return NormalizeCompiler(schema, registry=registry)()
+
+
+def jsonify_many(
+    obs,
+    schema,
+    registry=jsonify_dict,
+    verbose=False,
+    chunksize=DEFAULT_CHUNKSIZE,
+    column_registry=jsonify_column_dict,
+    memoize=True,
+):
+    plan = compile_jsonify(schema, registry=registry, column_registry=column_registry)
+    return plan.iterate(obs, verbose=verbose, chunksize=chunksize, memoize=memoize)
+
+
+class _PlanCache(object):
+    """LRU cache of the plans of jsonify_row(), keyed by the schema and the registry
+    (by identity, so the schema is not modified after used, same as Mapping's plan)
+    """
+
+    def __init__(self, maxsize=32):
+        self.maxsize = maxsize
+        self.store = (
+            OrderedDict()
+        )  # (id(schema), id(registry)) -> (schema, registry, plan)
+        self.lock = threading.Lock()
+
+    def __call__(self, schema, registry):
+        k = (id(schema), id(registry))
+        with self.lock:
+            entry = self.store.get(k)
+            if entry is not None:
+                self.store.move_to_end(k)
+                return entry[2]
+        plan = compile_jsonify(schema, registry=registry)
+        with self.lock:
+            # schema and registry are kept alive, for the keys by id()
+            self.store[k] = (schema, registry, plan)
+            while len(self.store) > self.maxsize:
+                self.store.popitem(last=False)
+        return plan
+
+
+_row_plans = _PlanCache()
+
+
+def jsonify_row(row, schema, registry=jsonify_dict, verbose=False, separator="."):
+    """Row (or RowMapping) of Core's select() -> jsondict"""
+    row = as_row_mapping(row)
+    plan = _row_plans(schema, registry)
+    prefixes = label_prefixes(row.keys(), separator=separator)
+    return plan.fold_row(
+        row, marker if verbose else None, prefixes, separator=separator
+    )
+
+
+def jsonify_rows(rows, schema, registry=jsonify_dict, verbose=False, separator="."):
+    """Result (or iterable of Row) of Core's select() -> jsondicts"""
+    plan = _row_plans(schema, registry)
+    return plan.iterate_rows(rows, verbose=verbose, separator=separator)
+
+
 class ModelLookup(object):
     def __init__(self, module):
         self.module = module
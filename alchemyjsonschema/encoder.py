@@ -0,0 +1,141 @@
+# -*- coding:utf-8 -*-
+"""
+model objects -> json bytes (encoder backends)
+
+    backend = get_encoder()  # orjson if installed, else json (stdlib)
+    plan = compile_jsonify(
+        schema,
+        registry=backend.jsonify_registry(jsonify_dict),
+        column_registry=backend.column_registry(jsonify_column_dict),
+    )
+    backend.dumps(plan(ob))
+
+the values of the formats which the backend encodes natively (e.g. datetime)
+are kept as is by the plan, and converted only once by the encoder.
+"""
+
+from datetime import datetime, date
+from decimal import Decimal
+from uuid import UUID
+from .dictify import (
+    maybe_wrap,
+    unwrap_maybe,
+    passthrough,
+    datetime_rfc3339,
+    isoformat0,
+)
+
+
+def _passthrough_column(values):
+    return values
+
+
+class EncoderBackend(object):
+    name = None
+    # {(type, format): converter}, encoded by the backend itself (same result).
+    # only the default converters are replaced, custom ones are used as is
+    native_formats = {}
+    native_strings = (str,)  # classes encoded as string by the backend itself
+
+    def jsonify_registry(self, registry):
+        registry = dict(registry)
+        for k, converter in self.native_formats.items():
+            wrapped = unwrap_maybe(registry.get(k))
+            if wrapped is not None and wrapped[0] is converter:
+                registry[k] = maybe_wrap(passthrough, wrapped[1])
+
+        fn = registry.get(("string", None))
+        if fn is not None and len(self.native_strings) > 1:
+            wrapped = unwrap_maybe(fn)
+            if wrapped is None:  # None is also passed to fn
+                registry[("string", None)] = self._native_or(fn)
+            else:
+                registry[("string", None)] = maybe_wrap(
+                    self._native_or(wrapped[0]), wrapped[1]
+                )
+        return registry
+
+    def column_registry(self, column_registry):
+        column_registry = dict(column_registry)
+        column_registry[passthrough] = _passthrough_column
+        return column_registry
+
+    def _native_or(self, fn):
+        native = frozenset(self.native_strings)
+
+        def convert(ob):
+            if ob.__class__ in native:
+                return ob
+            return fn(ob)
+
+        return convert
+
+    def default(self, ob):
+        # for the values that are not converted by the registry
+        if isinstance(ob, datetime):
+            return datetime_rfc3339(ob)
+        elif isinstance(ob, date):
+            return isoformat0(ob)
+        elif isinstance(ob, UUID):
+            return str(ob)
+        elif isinstance(ob, Decimal):
+            return float(ob)
+        raise TypeError(
+            "Object of type {} is not JSON serializable".format(ob.__class__.__name__)
+        )
+
+    def dumps(self, ob):
+        """-> bytes (utf-8)"""
+        raise NotImplementedError
+
+
+class JSONBackend(EncoderBackend):
+    """json module (stdlib)"""
+
+    name = "json"
+
+    def __init__(self):
+        import json
+
+        self.encoder = json.JSONEncoder(
+            ensure_ascii=False, separators=(",", ":"), default=self.default
+        )
+
+    def dumps(self, ob):
+        return self.encoder.encode(ob).encode("utf-8")
+
+
+class OrjsonBackend(EncoderBackend):
+    """orjson, datetime, date and UUID are encoded natively"""
+
+    name = "orjson"
+    native_formats = {
+        ("string", "date-time"): datetime_rfc3339,
+        ("string", "date"): isoformat0,
+    }
+    native_strings = (str, UUID)
+
+    def __init__(self):
+        import orjson
+
+        self._dumps = orjson.dumps
+        # naive datetime is treated as UTC, same as datetime_rfc3339()
+        self.option = orjson.OPT_NAIVE_UTC
+
+    def dumps(self, ob):
+        return self._dumps(ob, default=self.default, option=self.option)
+
+
+backends = {"json": JSONBackend, "orjson": OrjsonBackend}
+
+
+def get_encoder(name=None):
+    """name is a backend name, or None (auto detected)"""
+    if isinstance(name, EncoderBackend):
+        return name
+    if name is not None:
+        return backends[name]()
+    try:
+        return OrjsonBackend()
+    except ImportError:
+        return JSONBackend()
@@ -0,0 +1,96 @@
+# -*- coding:utf-8 -*-
+"""
+model -> fingerprint (digest of the mapped table's definition)
+"""
+import hashlib
+import json
+from sqlalchemy.inspection import inspect
+
+try:
+    from importlib.metadata import version as _version
+
+    # the version of the files made from the fingerprints (bundle, cache)
+    VERSION = "1:{}".format(_version("alchemyjsonschema"))
+except Exception:  # python3.7 or not installed
+    VERSION = "1"
+
+
+def fingerprint(model):
+    mapper = inspect(model).mapper
+    data = {
+        "name": model.__name__,
+        "doc": model.__doc__,
+        "table": [_describe_table(t) for t in mapper.tables],
+        "relationships": [
+            _describe_relationship(prop)
+            for prop in sorted(mapper.relationships, key=lambda p: p.key)
+        ],
+    }
+    return hashlib.sha1(
+        json.dumps(data, sort_keys=True, default=repr).encode("utf-8")
+    ).hexdigest()
+
+
+def _describe_table(table):
+    return {
+        "name": table.name,
+        "columns": [_describe_column(c) for c in table.columns],
+    }
+
+
+def _describe_column(c):
+    return {
+        "name": c.name,
+        "type": repr(c.type),
+        "nullable": c.nullable,
+        "primary_key": c.primary_key,
+        "default": _describe_default(c.default),
+        "server_default": _describe_default(c.server_default),
+        "foreign_keys": sorted(fk.target_fullname for fk in c.foreign_keys),
+        "doc": c.doc,
+    }
+
+
+def _describe_default(default):
+    if default is None:
+        return None
+    arg = getattr(default, "arg", default)
+    if callable(arg):
+        # repr() of function includes its address
+        return "{}:{}".format(
+            getattr(arg, "__module__", ""), getattr(arg, "__qualname__", "")
+        )
+    return str(getattr(arg, "text", arg))
+
+
+def _describe_relationship(prop):
+    return {
+        "key": prop.key,
+        "direction": prop.direction.name,
+        "target": prop.mapper.class_.__name__,
+        "uselist": prop.uselist,
+        "back_populates": prop.back_populates,
+        "backref": (
+            prop.backref if isinstance(prop.backref, str) else repr(prop.backref)
+        ),
+        "local_columns": sorted(c.name for c in prop.local_columns),
+    }
+
+
+def related_models(models):
+    """models and all models reachable from them by relationships"""
+    r = []
+    seen = set()
+    pending = list(models)
+    while pending:
+        model = pending.pop(0)
+        if model in seen:
+            continue
+        seen.add(model)
+        r.append(model)
+        pending.extend(p.mapper.class_ for p in inspect(model).mapper.relationships)
+    return r
+
+
+def model_path(model):
+    return "{}:{}".format(model.__module__, model.__qualname__)
@@ -0,0 +1,209 @@
+# -*- coding:utf-8 -*-
+"""
+lazy loads and SQL statements during serialization (opt-in)
+
+    instrument = Instrumentation(strict=False)
+    jsondict = instrument.jsonify(a0, schema)
+    report = instrument.last_report
+    report.statements, report.lazy_loads  # 2, 2
+    report.paths  # Counter({"children": 1, "children.children": 1})
+
+with strict=True, LazyLoadError is raised instead of loading. as Mapping's
+option, only `sample_rate` of calls are instrumented (for production).
+(the schema paths are reported by jsondict_from_object() and dict_from_object()
+only, the other methods of Mapping report the counts, with the path "")
+"""
+
+import random
+import threading
+from collections import Counter
+from .dictify import DictWalker, jsonify_of, attribute_of, jsonify_dict, marker
+
+
+class LazyLoadError(Exception):
+    def __init__(self, path, message):
+        super().__init__(message)
+        self.path = path
+
+
+class LoadEvent(object):
+    def __init__(self, path, kind, statement):
+        self.path = path  # e.g. "group.users"
+        self.kind = kind  # "relationship" or "column"
+        self.statement = statement
+
+    def __repr__(self):
+        return "<LoadEvent {} path={!r}>".format(self.kind, self.path)
+
+
+class LoadReport(object):
+    def __init__(self, name=None):
+        self.name = name
+        self.statements = 0  # all SQL statements (including the lazy loads)
+        self.lazy_loads = 0
+        self.paths = Counter()  # schema path -> lazy loads
+        self.events = []
+
+    def asdict(self):
+        return {
+            "name": self.name,
+            "statements": self.statements,
+            "lazy_loads": self.lazy_loads,
+            "paths": dict(self.paths),
+        }
+
+    def __repr__(self):
+        return "<LoadReport {} statements={} lazy_loads={}>".format(
+            self.name, self.statements, self.lazy_loads
+        )
+
+
+class _Tracking(object):
+    def __init__(self, report, strict):
+        self.report = report
+        self.strict = strict
+        self.path = []
+
+
+_local = threading.local()
+_install_lock = threading.Lock()
+_installed = False
+
+
+def _current():
+    return getattr(_local, "tracking", None)
+
+
+def _on_orm_execute(orm_execute_state):
+    tracking = _current()
+    if tracking is None:
+        return
+    if orm_execute_state.is_relationship_load:
+        kind = "relationship"
+    elif orm_execute_state.is_column_load:
+        kind = "column"
+    else:
+        return
+
+    path = ".".join(tracking.path)
+    if tracking.strict:
+        raise LazyLoadError(path, "{} lazy load is found, path={!r}".format(kind, path))
+    report = tracking.report
+    report.lazy_loads += 1
+    report.paths[path] += 1
+    report.events.append(LoadEvent(path, kind, str(orm_execute_state.statement)))
+
+
+def _on_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    tracking = _current()
+    if tracking is not None:
+        tracking.report.statements += 1
+
+
+def install():
+    """listening the events of all sessions and engines (at once)"""
+    global _installed
+    with _install_lock:
+        if _installed:
+            return
+        from sqlalchemy import event
+        from sqlalchemy.engine import Engine
+        from sqlalchemy.orm import Session
+
+        event.listen(Session, "do_orm_execute", _on_orm_execute)
+        event.listen(Engine, "before_cursor_execute", _on_cursor_execute)
+        _installed = True
+
+
+class TracingDictWalker(DictWalker):
+    """DictWalker, keeping the schema path of the current property"""
+
+    def __init__(self, schema, convert, getter, path, **kwargs):
+        super().__init__(schema, convert, getter, **kwargs)
+        self.path = path
+
+    def on_property(self, ob, name, schema):
+        self.path.append(name)
+        try:
+            return super().on_property(ob, name, schema)
+        finally:
+            self.path.pop()
+
+
+class Instrumentation(object):
+    def __init__(self, strict=False, sample_rate=1.0, on_report=None):
+        self.strict = strict  # if True, LazyLoadError is raised
+        self.sample_rate = sample_rate  # used by Mapping
+        self.on_report = on_report  # callback, report -> None
+        self.last_report = None
+
+    def sampled(self):
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+    def track(self, name=None, path=None):
+        """context manager, the statements in the block are reported"""
+        return _TrackingContext(self, name, path)
+
+    def track_iter(self, it, name=None):
+        """generator, the statements are reported while the items are produced
+        (not while they are consumed). the report is made when it is exhausted"""
+        context = _TrackingContext(self, name, None)
+        it = iter(it)
+        try:
+            while True:
+                context.activate()
+                try:
+                    item = next(it)
+                except StopIteration:
+                    return
+                finally:
+                    context.deactivate()
+                yield item
+        finally:
+            context.finish()
+
+    def walk(self, ob, schema, convert, getter, registry, marker):
+        path = []
+        with self.track(schema.get("title"), path):
+            walker = TracingDictWalker(
+                schema, convert, getter, path, registry=registry, marker=marker
+            )
+            return walker(ob)
+
+    def jsonify(self, ob, schema, registry=jsonify_dict, verbose=False):
+        _marker = marker if verbose else None
+        return self.walk(ob, schema, jsonify_of, getattr, registry, _marker)
+
+    def dictify(self, ob, schema):
+        return self.walk(ob, schema, attribute_of, getattr, None, marker)
+
+
+class _TrackingContext(object):
+    def __init__(self, instrumentation, name, path):
+        self.instrumentation = instrumentation
+        self.tracking = _Tracking(LoadReport(name), instrumentation.strict)
+        if path is not None:
+            self.tracking.path = path
+        self.prev = None
+
+    def activate(self):
+        install()
+        self.prev = _current()
+        _local.tracking = self.tracking
+
+    def deactivate(self):
+        _local.tracking = self.prev
+
+    def finish(self):
+        report = self.tracking.report
+        self.instrumentation.last_report = report
+        if self.instrumentation.on_report is not None:
+            self.instrumentation.on_report(report)
+
+    def __enter__(self):
+        self.activate()
+        return self.tracking.report
+
+    def __exit__(self, typ, val, tb):
+        self.deactivate()
+        self.finish()
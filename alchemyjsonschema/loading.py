@@ -0,0 +1,75 @@
+# -*- coding:utf-8 -*-
+"""
+schema -> loader options (for loading everything jsonify() touches, at once)
+
+    options = loader_options(User, schema)
+    users = session.scalars(select(User).options(*options)).all()
+    [jsonify(user, schema) for user in users]  # no more SQL
+
+relationships in the schema are eager loaded (selectinload for collections,
+joinedload for many-to-one), and only the columns in the schema are loaded.
+"""
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import (
+    joinedload,
+    selectinload,
+    load_only,
+    ColumnProperty,
+    RelationshipProperty,
+)
+from .dictify import get_properties, _has_substructure
+
+
+def default_strategy(prop):
+    if prop.uselist:
+        return selectinload  # joinedload() of collections requires .unique()
+    return joinedload
+
+
+class LoaderOptionsBuilder(object):
+    def __init__(self, schema, strategy=default_strategy, columns=True):
+        self.schema = schema
+        self.strategy = strategy  # RelationshipProperty -> loader function
+        self.columns = columns  # if True, load_only() the columns in the schema
+
+    def __call__(self, model):
+        return self.build(inspect(model), get_properties(self.schema, self.schema), [])
+
+    def build(self, mapper, properties, history):
+        if id(properties) in history:  # recursive definitions
+            return []
+        history = history + [id(properties)]
+
+        columns = []
+        options = []
+        for name, schema in properties.items():
+            prop = mapper.attrs.get(name)
+            if isinstance(prop, ColumnProperty):
+                columns.append(prop.class_attribute)
+            elif isinstance(prop, RelationshipProperty) and _has_substructure(schema):
+                # e.g. User.group_id for User.group
+                for c in prop.local_columns:
+                    if mapper.persist_selectable.c.contains_column(c):
+                        columns.append(mapper.get_property_by_column(c).class_attribute)
+                loader = self.strategy(prop)(prop.class_attribute)
+                suboptions = self.build(
+                    prop.mapper, get_properties(schema, self.schema), history
+                )
+                if suboptions:
+                    loader = loader.options(*suboptions)
+                options.append(loader)
+
+        if self.columns:
+            if not columns:  # e.g. {"properties": {}}
+                columns = [
+                    mapper.get_property_by_column(c).class_attribute
+                    for c in mapper.primary_key
+                ]
+            options.insert(0, load_only(*columns))
+        return options
+
+
+def loader_options(model, schema, strategy=default_strategy, columns=True):
+    """-> loader options, for select(model).options(*options)"""
+    return LoaderOptionsBuilder(schema, strategy=strategy, columns=columns)(model)
@@ -1,26 +1,32 @@
 # -*- coding:utf-8 -*-
+from contextlib import nullcontext
 from functools import partial
 from .dictify import (
     objectify,
-    jsonify,
+    compile_jsonify,
+    compile_normalize,
     dictify,
-    normalize,
     prepare,
     apply_changes,
     validate_all,
     ModelLookup,
     jsonify_dict,
+    jsonify_column_dict,
     normalize_dict,
     prepare_dict,
     raise_error,
+    DEFAULT_CHUNKSIZE,
+    as_row_mapping,
+    label_prefixes,
+    marker,
 )
-from jsonschema import validate, FormatChecker
-from jsonschema.validators import Draft3Validator, Draft4Validator
+from .stream import JSONStreamWriter
 from . import default_restriction_dict, default_column_to_schema
 
 
 class DefaultRegistry:
     jsonify = jsonify_dict
+    jsonify_column = jsonify_column_dict
     normalize = normalize_dict
     prepare = prepare_dict
     restriction = default_restriction_dict
@@ -35,6 +41,9 @@ class Mapping(object):
         modellookup,
         registry=DefaultRegistry,
         treat_error=raise_error,
+        codegen=False,
+        encoder=None,
+        instrument=None,
     ):
         self.validator = validator
         self.format_checker = validator.format_checker
@@ -43,17 +52,209 @@ class Mapping(object):
         self.modellookup = modellookup
         self.registry = registry
         self.treat_error = treat_error
+        self._jsonify_plan = None
+        self._normalize_plan = None
+        # if True, generated functions are used (opt-in, see: codegen.py)
+        self.codegen = codegen
+        self._functions = {}
+        self._encoder = encoder  # backend or backend name (see: encoder.py)
+        self._encoder_plan = None
+        self.instrument = instrument  # Instrumentation (see: instrument.py)
+
+    @property
+    def jsonify_plan(self):
+        # compiled at once, and reused
+        if self._jsonify_plan is None:
+            self._jsonify_plan = compile_jsonify(
+                self.schema,
+                registry=self.registry.jsonify,
+                column_registry=getattr(
+                    self.registry, "jsonify_column", jsonify_column_dict
+                ),
+            )
+        return self._jsonify_plan
+
+    @property
+    def normalize_plan(self):
+        if self._normalize_plan is None:
+            self._normalize_plan = compile_normalize(
+                self.schema, registry=self.registry.normalize
+            )
+        return self._normalize_plan
+
+    @property
+    def encoder(self):
+        if self._encoder is None or isinstance(self._encoder, str):
+            from .encoder import get_encoder
+
+            self._encoder = get_encoder(self._encoder)
+        return self._encoder
+
+    @property
+    def encoder_plan(self):
+        # same as jsonify_plan, but natively encoded values are kept as is
+        if self._encoder_plan is None:
+            encoder = self.encoder
+            self._encoder_plan = compile_jsonify(
+                self.schema,
+                registry=encoder.jsonify_registry(self.registry.jsonify),
+                column_registry=encoder.column_registry(
+                    getattr(self.registry, "jsonify_column", jsonify_column_dict)
+                ),
+            )
+        return self._encoder_plan
+
+    def generated_function(self, name):
+        fn = self._functions.get(name)
+        if fn is None:
+            from . import codegen
+
+            if name == "jsonify":
+                fn = codegen.generate_jsonify(
+                    self.schema, registry=self.registry.jsonify
+                )
+            elif name == "normalize":
+                fn = codegen.generate_normalize(
+                    self.schema, registry=self.registry.normalize
+                )
+            else:
+                fn = codegen.generate_dictify(self.schema)
+            self._functions[name] = fn
+        return fn
+
+    def _sampled(self):
+        return self.instrument is not None and self.instrument.sampled()
+
+    def _track(self):
+        if self._sampled():
+            return self.instrument.track(self.schema.get("title"))
+        return nullcontext()
 
     def jsondict_from_object(self, ob, verbose=False):
-        return jsonify(ob, self.schema, registry=self.registry.jsonify, verbose=verbose)
+        if self._sampled():
+            return self.instrument.jsonify(
+                ob, self.schema, registry=self.registry.jsonify, verbose=verbose
+            )
+        if self.codegen:
+            return self.generated_function("jsonify")(ob, verbose=verbose)
+        return self.jsonify_plan(ob, verbose=verbose)
+
+    def jsondicts_from_objects(
+        self, obs, verbose=False, chunksize=DEFAULT_CHUNKSIZE, memoize=True
+    ):
+        it = self.jsonify_plan.iterate(
+            obs, verbose=verbose, chunksize=chunksize, memoize=memoize
+        )
+        if self._sampled():
+            return self.instrument.track_iter(it, self.schema.get("title"))
+        return it
+
+    def jsondict_from_row(self, row, verbose=False):
+        # row of Core's select(), nested objects are found by labels ("group.name")
+        row = as_row_mapping(row)
+        prefixes = label_prefixes(row.keys())
+        return self.jsonify_plan.fold_row(row, marker if verbose else None, prefixes)
+
+    def jsondicts_from_rows(self, rows, verbose=False):
+        return self.jsonify_plan.iterate_rows(rows, verbose=verbose)
+
+    def iterencode_objects(self, obs, verbose=False, lines=False):
+        writer = JSONStreamWriter(self.jsonify_plan, lines=lines)
+        it = writer.iterencode(obs, verbose=verbose)
+        if self._sampled():
+            return self.instrument.track_iter(it, self.schema.get("title"))
+        return it
+
+    def dump_objects(self, obs, fp, verbose=False, lines=False):
+        writer = JSONStreamWriter(self.jsonify_plan, lines=lines)
+        with self._track():
+            return writer.dump(obs, fp, verbose=verbose)
+
+    def json_from_object(self, ob, verbose=False):
+        """-> json bytes"""
+        with self._track():
+            return self.encoder.dumps(self.encoder_plan(ob, verbose=verbose))
+
+    def json_from_objects(self, obs, verbose=False, chunksize=DEFAULT_CHUNKSIZE):
+        """-> json bytes (array)"""
+        plan = self.encoder_plan
+        with self._track():
+            # the results are encoded at once, so the memoized results are shared
+            rows = list(
+                plan.iterate(obs, verbose=verbose, chunksize=chunksize, share=True)
+            )
+            return self.encoder.dumps(rows)
+
+    def loader_options(self, **kwargs):
+        """-> loader options, loading all attributes in the schema at once"""
+        from .loading import loader_options
+
+        return loader_options(self.model, self.schema, **kwargs)
+
+    async def ajsondict_from_object(self, ob, verbose=False, session=None):
+        """async version (AsyncSession), the relationships are preloaded"""
+        from .aio import run_preloaded
+
+        return await run_preloaded(
+            session,
+            [ob],
+            self.schema,
+            lambda: self.jsondict_from_object(ob, verbose=verbose),
+            model=self.model,
+        )
+
+    async def ajsondicts_from_objects(self, obs, verbose=False, session=None):
+        """-> list of jsondict, the relationships are preloaded at once"""
+        from .aio import run_preloaded
+
+        obs = list(obs)
+        return await run_preloaded(
+            session,
+            obs,
+            self.schema,
+            lambda: list(self.jsondicts_from_objects(obs, verbose=verbose)),
+            model=self.model,
+        )
+
+    def astream_jsondicts(
+        self, session, stmt, verbose=False, chunksize=DEFAULT_CHUNKSIZE
+    ):
+        """async generator, stmt is select(model) (loader options are added)"""
+        from .aio import astream
+
+        return astream(
+            session,
+            stmt,
+            self.jsonify_plan,
+            options=self.loader_options(),
+            verbose=verbose,
+            chunksize=chunksize,
+        )
+
+    async def aapply_changes_from_dict(self, ob, params, session=None):
+        from .aio import run_preloaded
+
+        return await run_preloaded(
+            session,
+            [ob],
+            self.schema,
+            lambda: self.apply_changes_from_dict(ob, params),
+            model=self.model,
+        )
 
     def jsondict_from_string_only_dict(self, string_only_dict):
         return prepare(string_only_dict, self.schema, registry=self.registry.prepare)
 
     def dict_from_jsondict(self, jsondict):
-        return normalize(jsondict, self.schema, registry=self.registry.normalize)
+        if self.codegen:
+            return self.generated_function("normalize")(jsondict)
+        return self.normalize_plan(jsondict)
 
     def dict_from_object(self, ob):
+        if self._sampled():
+            return self.instrument.dictify(ob, self.schema)
+        if self.codegen:
+            return self.generated_function("dictify")(ob)
         return dictify(ob, self.schema)
 
     def object_from_dict(self, params, strict=True):
@@ -80,24 +281,64 @@ class MappingFactory(object):
         module,
         resolver=None,
         format_checker=None,
+        codegen=False,
+        encoder=None,
+        instrument=None,
     ):
+        # registering "date" and "time", also to the format checker passed
+        # (jsonschema is already imported, by validator_class)
+        from .custom import format
+
         self.schema_factory = schema_factory
         self.validator_class = validator_class
         self.resolver = resolver
-        self.format_checker = format_checker or FormatChecker()
+        self.format_checker = format_checker or default_format_checker()
+        format.register(self.format_checker)
         self.module = module
+        self.codegen = codegen
+        self.encoder = encoder
+        self.instrument = instrument
 
-    def __call__(self, model, includes=None, excludes=None, depth=None):
+    def __call__(self, model, includes=None, excludes=None, depth=None, lazy=False):
         schema = self.schema_factory(
-            model, includes=includes, excludes=excludes, depth=depth
+            model, includes=includes, excludes=excludes, depth=depth, lazy=lazy
         )
+        return self.from_schema(model, schema)
+
+    def from_schema(self, model, schema, module=None):
+        # schema is already built (e.g. loaded from bundle)
         validator = self.validator_class(
             schema, resolver=self.resolver, format_checker=self.format_checker
         )
-        modellookup = self._ModelLookup(self.module)
-        mapping = self._Mapping(validator, model, modellookup)
+        modellookup = self._ModelLookup(module or self.module)
+        mapping = self._Mapping(
+            validator,
+            model,
+            modellookup,
+            codegen=self.codegen,
+            encoder=self.encoder,
+            instrument=self.instrument,
+        )
         return mapping
 
 
-Draft3MappingFactory = partial(MappingFactory, Draft3Validator)
-Draft4MappingFactory = partial(MappingFactory, Draft4Validator)
+def default_format_checker():
+    from jsonschema import FormatChecker
+
+    return FormatChecker()
+
+
+def __getattr__(name):
+    # jsonschema is imported lazily (slow to import)
+    if name == "Draft3MappingFactory":
+        from jsonschema.validators import Draft3Validator
+
+        factory = partial(MappingFactory, Draft3Validator)
+    elif name == "Draft4MappingFactory":
+        from jsonschema.validators import Draft4Validator
+
+        factory = partial(MappingFactory, Draft4Validator)
+    else:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    globals()[name] = factory
+    return factory
@@ -0,0 +1,142 @@
+# -*- coding:utf-8 -*-
+"""
+observing schema generation (timings and counts)
+
+    collector = CostCollector()
+    factory = SchemaFactory(StructuralWalker, observer=collector)
+    for model in models:
+        factory(model)
+    collector.report()  # the most expensive models come first
+"""
+
+import sys
+
+
+class SchemaObserver(object):
+    """events of SchemaFactory. elapsed times are in seconds"""
+
+    def model_start(self, model):
+        pass
+
+    def model_end(self, model, elapsed):
+        pass
+
+    def child_schema_start(self, prop):
+        pass
+
+    def child_schema_end(self, prop, elapsed):
+        pass
+
+    def classified(self, column, type_, elapsed):
+        pass
+
+    def restricted(self, column, fn, elapsed):
+        pass
+
+
+class ModelCost(object):
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0  # built as toplevel
+        self.expansions = 0  # built as relationship (via ChildFactory.child_schema)
+        self.total = 0.0  # including the related models
+        self.self = 0.0  # excluding the related models
+        self.lookups = 0  # Classifier
+        self.lookup_time = 0.0
+        self.restrictions = 0
+        self.restriction_time = 0.0
+
+    def asdict(self):
+        return dict(self.__dict__)
+
+
+class CostCollector(SchemaObserver):
+    """per-model cost. nested relationships are subtracted from self time"""
+
+    def __init__(self):
+        self.costs = {}  # model name -> ModelCost
+        self.stack = []  # [ModelCost, elapsed of children]
+
+    def _get(self, name):
+        cost = self.costs.get(name)
+        if cost is None:
+            cost = self.costs[name] = ModelCost(name)
+        return cost
+
+    def _push(self, name):
+        self.stack.append([self._get(name), 0.0])
+
+    def _pop(self, elapsed):
+        cost, children = self.stack.pop()
+        cost.total += elapsed
+        cost.self += elapsed - children
+        if self.stack:
+            self.stack[-1][1] += elapsed
+        return cost
+
+    def _current(self, column):
+        if self.stack:
+            return self.stack[-1][0]
+        return self._get(getattr(column.table, "name", "?"))
+
+    def model_start(self, model):
+        self._push(model.__name__)
+
+    def model_end(self, model, elapsed):
+        self._pop(elapsed).calls += 1
+
+    def child_schema_start(self, prop):
+        self._push(prop.mapper.class_.__name__)
+
+    def child_schema_end(self, prop, elapsed):
+        self._pop(elapsed).expansions += 1
+
+    def classified(self, column, type_, elapsed):
+        cost = self._current(column)
+        cost.lookups += 1
+        cost.lookup_time += elapsed
+
+    def restricted(self, column, fn, elapsed):
+        cost = self._current(column)
+        cost.restrictions += 1
+        cost.restriction_time += elapsed
+
+    def clear(self):
+        self.costs.clear()
+        del self.stack[:]
+
+    def sorted(self, key="self"):
+        return sorted(self.costs.values(), key=lambda c: (-getattr(c, key), c.name))
+
+    def report(self, out=None, key="self", limit=None):
+        out = out or sys.stderr
+        costs = self.sorted(key=key)
+        if limit is not None:
+            costs = costs[:limit]
+
+        fmt = "{:<32} {:>10} {:>10} {:>6} {:>10} {:>8} {:>12}"
+        print(
+            fmt.format(
+                "model",
+                "self(s)",
+                "total(s)",
+                "calls",
+                "expansions",
+                "lookups",
+                "restrictions",
+            ),
+            file=out,
+        )
+        for c in costs:
+            print(
+                fmt.format(
+                    c.name,
+                    "{:.6f}".format(c.self),
+                    "{:.6f}".format(c.total),
+                    c.calls,
+                    c.expansions,
+                    c.lookups,
+                    c.restrictions,
+                ),
+                file=out,
+            )
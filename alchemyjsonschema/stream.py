@@ -0,0 +1,46 @@
+# -*- coding:utf-8 -*-
+"""
+model objects -> json text (row by row)
+"""
+
+import json
+from .dictify import compile_jsonify, jsonify_dict
+
+
+class JSONStreamWriter(object):
+    def __init__(self, plan, encoder=None, lines=False):
+        self.plan = plan
+        self.encoder = encoder or json.JSONEncoder()
+        self.lines = lines  # if True, newline delimited json (ndjson)
+
+    def iterencode(self, obs, verbose=False, chunksize=1):
+        # only `chunksize` rows are kept in memory at once
+        encode = self.encoder.encode
+        # each row is encoded at once, so the memoized results can be shared
+        rows = self.plan.iterate(obs, verbose=verbose, chunksize=chunksize, share=True)
+        if self.lines:
+            for row in rows:
+                yield encode(row) + "\n"
+            return
+
+        sep = "["
+        for row in rows:
+            yield sep + encode(row)
+            sep = ", "
+        yield "[]" if sep == "[" else "]"
+
+    def dump(self, obs, fp, verbose=False, chunksize=1):
+        # fp is file-like object (for socket, use `sock.makefile("w")`)
+        write = fp.write
+        for chunk in self.iterencode(obs, verbose=verbose, chunksize=chunksize):
+            write(chunk)
+
+
+def iterencode(obs, schema, registry=jsonify_dict, verbose=False, lines=False):
+    plan = compile_jsonify(schema, registry=registry)
+    return JSONStreamWriter(plan, lines=lines).iterencode(obs, verbose=verbose)
+
+
+def dump(obs, fp, schema, registry=jsonify_dict, verbose=False, lines=False):
+    plan = compile_jsonify(schema, registry=registry)
+    return JSONStreamWriter(plan, lines=lines).dump(obs, fp, verbose=verbose)
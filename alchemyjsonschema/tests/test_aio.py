@@ -0,0 +1,174 @@
+# -*- coding:utf-8 -*-
+import asyncio
+import pytest
+
+pytest.importorskip("greenlet")
+pytest.importorskip("aiosqlite")
+
+
+class _Counter(object):
+    def __init__(self):
+        self.n = 0
+
+    def __call__(self, *args, **kwargs):
+        self.n += 1
+
+
+def _run(fn):
+    import sqlalchemy as sa
+    from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+    from alchemyjsonschema.tests.models import Base, A0, A1, A2
+
+    async def main():
+        engine = create_async_engine("sqlite+aiosqlite://")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with AsyncSession(engine) as session:
+            for i in range(3):
+                a1s = [
+                    A1(
+                        pk=i * 10 + j,
+                        name="a1",
+                        children=[A2(pk=i * 10 + j, name="a2")],
+                    )
+                    for j in range(2)
+                ]
+                session.add(A0(pk=i, name="a0", children=a1s))
+            await session.commit()
+
+        counter = _Counter()
+        sa.event.listen(engine.sync_engine, "before_cursor_execute", counter)
+        try:
+            async with AsyncSession(engine) as session:
+                return await fn(session, counter)
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(main())
+
+
+def _makeMapping(model):
+    from alchemyjsonschema import SchemaFactory, StructuralWalker
+    from alchemyjsonschema.mapping import Draft4MappingFactory
+    from alchemyjsonschema.tests import models
+
+    factory = Draft4MappingFactory(SchemaFactory(StructuralWalker), models)
+    return factory(model)
+
+
+def _expected():
+    def a0(i):
+        return {
+            "pk": i,
+            "name": "a0",
+            "children": [
+                {
+                    "pk": i * 10 + j,
+                    "name": "a1",
+                    "children": [{"pk": i * 10 + j, "name": "a2"}],
+                }
+                for j in range(2)
+            ],
+        }
+
+    return [a0(i) for i in range(3)]
+
+
+def test_missing_greenlet_without_preloading():
+    from sqlalchemy.exc import StatementError
+    from alchemyjsonschema.tests.models import A0
+
+    mapping = _makeMapping(A0)
+
+    async def fn(session, counter):
+        a0 = await session.get(A0, 0)
+        with pytest.raises(StatementError):  # MissingGreenlet
+            mapping.jsondict_from_object(a0)
+
+    _run(fn)
+
+
+def test_ajsondict_from_object():
+    from alchemyjsonschema.tests.models import A0
+
+    mapping = _makeMapping(A0)
+
+    async def fn(session, counter):
+        a0 = await session.get(A0, 1)
+        counter.n = 0
+        result = await mapping.ajsondict_from_object(a0)
+        assert counter.n == 3  # A0, A0.children, A1.children
+        return result
+
+    assert _run(fn) == _expected()[1]
+
+
+def test_ajsondicts_from_objects():
+    import sqlalchemy as sa
+    from alchemyjsonschema.tests.models import A0
+
+    mapping = _makeMapping(A0)
+
+    async def fn(session, counter):
+        a0s = (await session.scalars(sa.select(A0).order_by(A0.pk))).all()
+        counter.n = 0
+        result = await mapping.ajsondicts_from_objects(a0s)
+        assert counter.n == 3  # not depending on the number of objects
+        return result
+
+    assert _run(fn) == _expected()
+
+
+def test_astream_jsondicts():
+    import sqlalchemy as sa
+    from alchemyjsonschema.tests.models import A0
+
+    mapping = _makeMapping(A0)
+
+    async def fn(session, counter):
+        stmt = sa.select(A0).order_by(A0.pk)
+        return [d async for d in mapping.astream_jsondicts(session, stmt, chunksize=2)]
+
+    assert _run(fn) == _expected()
+
+
+def test_ajsonify__expired_attributes():
+    from alchemyjsonschema.aio import ajsonify
+    from alchemyjsonschema.tests.models import A1
+
+    mapping = _makeMapping(A1)
+
+    async def fn(session, counter):
+        a1 = await session.get(A1, 10)
+        session.expire(a1, ["name"])
+        return await ajsonify(a1, mapping.schema)
+
+    result = _run(fn)
+    assert result["name"] == "a1"
+    assert result["parent"]["pk"] == 1
+
+
+def test_aapply_changes_from_dict():
+    from alchemyjsonschema.tests.models import A0
+
+    mapping = _makeMapping(A0)
+
+    async def fn(session, counter):
+        a0 = await session.get(A0, 0)
+        params = mapping.dict_from_jsondict(_expected()[0])
+        params["children"][0]["name"] = "changed"
+        await mapping.aapply_changes_from_dict(a0, params)
+        return [c.name for c in a0.children]
+
+    assert _run(fn) == ["changed", "a1"]
+
+
+def test_transient_object():
+    from alchemyjsonschema.tests.models import A0
+
+    mapping = _makeMapping(A0)
+
+    async def fn(session, counter):
+        return await mapping.ajsondict_from_object(A0(pk=1, name="a0"))
+
+    assert _run(fn) == {"pk": 1, "name": "a0", "children": []}
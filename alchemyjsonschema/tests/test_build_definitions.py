@@ -0,0 +1,49 @@
+# -*- coding:utf-8 -*-
+def _makeOne(*args, **kwargs):
+    from alchemyjsonschema import SchemaFactory, StructuralWalker
+
+    return SchemaFactory(StructuralWalker, *args, **kwargs)
+
+
+def test_it__same_as_toplevel_schema():
+    from alchemyjsonschema.tests.models import Group, User, A0, A1, A2
+
+    target = _makeOne()
+    models = [Group, User, A0, A1, A2]
+    result = target.build_definitions(models)
+
+    assert list(result.keys()) == ["Group", "User", "A0", "A1", "A2"]
+    for model in models:
+        expected = target(model)
+        expected.pop("definitions", None)
+        assert result[model.__name__] == expected
+
+
+def test_it__referenced_models_are_included():
+    from alchemyjsonschema.tests.models import A0
+
+    result = _makeOne().build_definitions([A0])
+
+    assert list(result.keys()) == ["A0", "A1", "A2"]
+    assert result["A0"]["properties"]["children"] == {
+        "type": "array",
+        "items": {"$ref": "#/definitions/A1"},
+    }
+    assert "definitions" not in result["A0"]
+
+
+def test_transformer__by_module():
+    from alchemyjsonschema.command._transformer import OpenAPI2Transformer
+    from alchemyjsonschema.tests import models
+
+    target = OpenAPI2Transformer(_makeOne())
+    result = target.transform(models, depth=None)
+
+    assert sorted(result["definitions"].keys()) == [
+        "A0",
+        "A1",
+        "A2",
+        "Group",
+        "MyModel",
+        "User",
+    ]
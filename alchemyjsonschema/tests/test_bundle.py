@@ -0,0 +1,112 @@
+# -*- coding:utf-8 -*-
+import json
+
+
+def _makeFactory(walker=None):
+    from alchemyjsonschema import SchemaFactory, StructuralWalker
+    from alchemyjsonschema.mapping import Draft4MappingFactory
+    from alchemyjsonschema.tests import models
+
+    return Draft4MappingFactory(SchemaFactory(walker or StructuralWalker), models)
+
+
+def _makeRegistry():
+    from alchemyjsonschema.bundle import MappingRegistry
+    from alchemyjsonschema.tests.models import User, Group
+
+    registry = MappingRegistry(_makeFactory())
+    registry.register(User)
+    registry.register(Group, excludes=["users"])
+    return registry
+
+
+def _load(*args, **kwargs):
+    from alchemyjsonschema.bundle import MappingRegistry
+
+    return MappingRegistry.load(*args, **kwargs)
+
+
+def test_it__roundtrip(tmpdir):
+    from alchemyjsonschema.tests.models import User, Group
+
+    filename = str(tmpdir.join("schemas.json"))
+    registry = _makeRegistry()
+    registry.save(filename)
+
+    loaded = _load(filename, _makeFactory())
+    assert loaded.regenerated == []
+    assert list(loaded) == [User, Group]
+    assert loaded[User].schema == registry[User].schema
+    assert loaded[Group].schema == registry[Group].schema
+    assert "users" not in loaded[Group].schema["properties"]
+
+    user = loaded[User].object_from_dict(
+        {"pk": 1, "name": "foo", "group": {"pk": 1, "name": "bar"}}
+    )
+    assert isinstance(user, User)
+    assert isinstance(user.group, Group)
+
+
+def test_it__fingerprint_mismatch__regenerated(tmpdir):
+    from alchemyjsonschema.tests.models import User, Group
+
+    filename = str(tmpdir.join("schemas.json"))
+    data = _makeRegistry().dump()
+    expected = data["entries"][1]["schema"]
+    data["entries"][1]["fingerprint"] = "xxx"
+    data["entries"][1]["schema"] = {}
+    with open(filename, "w") as wf:
+        json.dump(data, wf)
+
+    loaded = _load(filename, _makeFactory())
+    assert loaded.regenerated == [Group]
+    assert loaded[Group].schema == expected
+    assert "users" not in loaded[Group].schema["properties"]
+    assert User in loaded
+
+
+def test_it__another_factory__regenerated(tmpdir):
+    from alchemyjsonschema import ForeignKeyWalker
+    from alchemyjsonschema.tests.models import User
+
+    filename = str(tmpdir.join("schemas.json"))
+    _makeRegistry().save(filename)
+
+    factory = _makeFactory(ForeignKeyWalker)
+    loaded = _load(filename, factory, models=[User])
+    assert loaded.regenerated == [User]
+    assert loaded[User].schema == factory.schema_factory(User)
+
+
+def test_it__broken_or_missing_file(tmpdir):
+    from alchemyjsonschema.tests.models import User
+
+    filename = tmpdir.join("schemas.json")
+    filename.write("{")
+    assert len(_load(str(filename), _makeFactory())) == 0
+
+    loaded = _load(str(tmpdir.join("missing.json")), _makeFactory(), models=[User])
+    assert loaded.regenerated == [User]
+
+
+def test_it__removed_model_is_skipped(tmpdir):
+    from alchemyjsonschema.tests.models import User
+
+    filename = str(tmpdir.join("schemas.json"))
+    data = _makeRegistry().dump()
+    data["entries"][1]["model"] = "alchemyjsonschema.tests.models:Removed"
+    with open(filename, "w") as wf:
+        json.dump(data, wf)
+
+    loaded = _load(filename, _makeFactory())
+    assert list(loaded) == [User]
+
+
+def test_bundle_fingerprint__includes_related_models():
+    from alchemyjsonschema.bundle import bundle_fingerprint
+    from alchemyjsonschema.fingerprint import fingerprint
+    from alchemyjsonschema.tests.models import User, Group, A0
+
+    assert bundle_fingerprint(User) == bundle_fingerprint(Group)
+    assert bundle_fingerprint(User) != bundle_fingerprint(A0)
+    assert bundle_fingerprint(User) != fingerprint(User)
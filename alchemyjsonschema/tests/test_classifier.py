@@ -0,0 +1,97 @@
+# -*- coding:utf-8 -*-
+import sqlalchemy.types as t
+
+
+def _makeOne(*args, **kwargs):
+    from alchemyjsonschema import Classifier
+
+    return Classifier(*args, **kwargs)
+
+
+class MyString(t.String):
+    pass
+
+
+class MyDecorator(t.TypeDecorator):
+    impl = t.Integer
+    cache_ok = True
+
+
+def test_it():
+    target = _makeOne({t.String: "string", t.Integer: "integer"})
+
+    assert target[MyString()] == (MyString, "string")
+    assert target[MyDecorator()] == (MyDecorator, "integer")
+    assert target.lookup(MyString) == (t.String, "string")
+
+
+def test_it__not_found():
+    import pytest
+    from alchemyjsonschema import InvalidStatus
+
+    target = _makeOne({t.Integer: "integer"})
+
+    with pytest.raises(InvalidStatus):
+        target[MyString()]
+
+
+def test_it__cached():
+    target = _makeOne({t.String: "string"})
+    target[MyString()]
+
+    assert target._cache == {MyString: t.String}
+
+
+def test_it__mapping_is_mutated():
+    mapping = {t.String: "string"}
+    target = _makeOne(mapping)
+    assert target[MyString()] == (MyString, "string")
+
+    # replaced
+    mapping[t.String] = "xxx"
+    assert target[MyString()] == (MyString, "xxx")
+
+    # added
+    mapping[MyString] = "my-string"
+    assert target[MyString()] == (MyString, "my-string")
+
+    # removed
+    del mapping[MyString]
+    assert target[MyString()] == (MyString, "xxx")
+
+
+def test_it__mapping_is_reassigned():
+    target = _makeOne({t.String: "string"})
+    assert target[MyString()] == (MyString, "string")
+
+    target.mapping = {MyString: "my-string"}
+    assert target[MyString()] == (MyString, "my-string")
+
+
+def test_restriction__cached():
+    import sqlalchemy as sa
+    from sqlalchemy.ext.declarative import declarative_base
+    from alchemyjsonschema import SchemaFactory, ForeignKeyWalker
+
+    Base = declarative_base()
+
+    class Model(Base):
+        __tablename__ = "Model"
+        pk = sa.Column(sa.Integer, primary_key=True)
+        name = sa.Column(MyString(10))
+        other_name = sa.Column(MyString(20))
+
+    target = SchemaFactory(ForeignKeyWalker)
+    result = target(Model)
+    assert result["properties"]["name"] == {"type": "string", "maxLength": 10}
+    assert result["properties"]["other_name"] == {"type": "string", "maxLength": 20}
+    assert list(target._restriction_cache.keys()) == [t.Integer, MyString]
+
+
+def test_postgresql_types__without_mro():
+    import sqlalchemy.dialects.postgresql as pgt
+    from alchemyjsonschema import default_column_to_schema
+
+    target = _makeOne(default_column_to_schema, see_mro=False)
+    assert target[pgt.JSONB()] == (pgt.JSONB, "object")
+    assert target[pgt.UUID()] == (pgt.UUID, "string")
@@ -0,0 +1,115 @@
+# -*- coding:utf-8 -*-
+import pytest
+
+
+def _makeObjects():
+    from datetime import datetime
+    from alchemyjsonschema.tests.models import Group, User, A0, A1, A2
+
+    group = Group(pk=1, name="g", color="red", created_at=datetime(2000, 1, 1, 10))
+    users = [
+        User(pk=1, name="foo", group=group, created_at=datetime(2000, 1, 1)),
+        User(pk=2, name=None, group=group),
+    ]
+    a0 = A0(pk=1, name="a0", children=[A1(pk=2, name="a1", children=[A2(pk=3)])])
+    return [group, users[0], users[1], a0, a0.children[0]]
+
+
+@pytest.mark.parametrize("walker", ["StructuralWalker", "ForeignKeyWalker"])
+def test_same_as_dictify(walker):
+    import alchemyjsonschema
+    from alchemyjsonschema.dictify import jsonify, dictify, normalize
+    from alchemyjsonschema.codegen import (
+        generate_jsonify,
+        generate_dictify,
+        generate_normalize,
+    )
+
+    factory = alchemyjsonschema.SchemaFactory(getattr(alchemyjsonschema, walker))
+    for ob in _makeObjects():
+        schema = factory(ob.__class__)
+        fn = generate_jsonify(schema)
+        assert fn(ob) == jsonify(ob, schema)
+        assert fn(ob, verbose=True) == jsonify(ob, schema, verbose=True)
+        assert generate_dictify(schema)(ob) == dictify(ob, schema)
+
+        jsondict = jsonify(ob, schema, verbose=True)
+        assert generate_normalize(schema)(jsondict) == normalize(jsondict, schema)
+
+
+def test_source():
+    from alchemyjsonschema import SchemaFactory, StructuralWalker
+    from alchemyjsonschema.codegen import generate_jsonify
+    from alchemyjsonschema.tests.models import User
+
+    fn = generate_jsonify(SchemaFactory(StructuralWalker)(User))
+    assert "def f0(ob, marker):" in fn.source
+    assert "def f1(ob, marker):" in fn.source  # for Group
+    assert "v = ob.created_at" in fn.source
+
+
+def test_jsonify__not_mapped_attribute__fallback():
+    from types import SimpleNamespace
+    from alchemyjsonschema.codegen import generate_jsonify
+
+    schema = {
+        "type": "object",
+        "properties": {
+            "name": {"type": "string"},
+            "not-identifier": {"type": "integer"},
+        },
+    }
+    fn = generate_jsonify(schema)
+    assert fn(SimpleNamespace(name="foo")) == {"name": "foo"}
+    assert fn(SimpleNamespace(name="foo"), verbose=True) == {
+        "name": "foo",
+        "not-identifier": None,
+    }
+
+
+def test_dictify__missing_attribute__raise_error():
+    from types import SimpleNamespace
+    from alchemyjsonschema.codegen import generate_dictify
+    from alchemyjsonschema.dictify import dictify
+
+    schema = {
+        "type": "object",
+        "properties": {"name": {"type": "string"}, "age": {"type": "integer"}},
+    }
+    ob = SimpleNamespace(name="foo")
+    with pytest.raises(AttributeError):
+        dictify(ob, schema)
+    with pytest.raises(AttributeError):
+        generate_dictify(schema)(ob)
+
+
+def test_normalize__error():
+    from alchemyjsonschema import SchemaFactory, StructuralWalker
+    from alchemyjsonschema.dictify import ConvertionError
+    from alchemyjsonschema.codegen import generate_normalize
+    from alchemyjsonschema.tests.models import User
+
+    fn = generate_normalize(SchemaFactory(StructuralWalker)(User))
+    with pytest.raises(ConvertionError) as e:
+        fn({"pk": 1, "group": {"pk": "x"}})
+    assert e.value.name == "pk"
+
+
+def test_mapping():
+    from alchemyjsonschema import SchemaFactory, StructuralWalker
+    from alchemyjsonschema.mapping import Draft4MappingFactory
+    from alchemyjsonschema.tests import models
+
+    schema_factory = SchemaFactory(StructuralWalker)
+    mapping = Draft4MappingFactory(schema_factory, models)(models.User)
+    generated = Draft4MappingFactory(schema_factory, models, codegen=True)(models.User)
+    assert generated.codegen
+
+    for ob in _makeObjects()[1:3]:
+        jsondict = mapping.jsondict_from_object(ob)
+        assert generated.jsondict_from_object(ob) == jsondict
+        assert generated.dict_from_object(ob) == mapping.dict_from_object(ob)
+        assert generated.dict_from_jsondict(jsondict) == mapping.dict_from_jsondict(
+            jsondict
+        )
+    assert sorted(generated._functions) == ["dictify", "jsonify", "normalize"]
@@ -0,0 +1,90 @@
+# -*- coding:utf-8 -*-
+def _makeOne(*args, **kwargs):
+    from alchemyjsonschema.command.driver import Driver
+
+    return Driver(*args, **kwargs)
+
+
+def test_it__jobs__same_output(tmp_path):
+    module_path = "alchemyjsonschema.tests.models"
+    for layout in ["swagger2.0", "openapi3.0"]:
+        target = _makeOne("structural", "default", layout)
+        serial = tmp_path / "serial.json"
+        parallel = tmp_path / "parallel.json"
+
+        target.run(module_path, str(serial), format="json")
+        target.run(module_path, str(parallel), format="json", jobs=2)
+        assert serial.read_text() == parallel.read_text()
+
+
+def test_it__incremental(tmp_path):
+    import json
+    from alchemyjsonschema.command._cache import cache_filename
+
+    module_path = "alchemyjsonschema.tests.models"
+    out = tmp_path / "out.json"
+    target = _makeOne("structural", "default", "openapi3.0")
+
+    target.run(module_path, str(out), format="json")
+    expected = out.read_text()
+
+    # first time, all models are built
+    target.run(module_path, str(out), format="json", incremental=True)
+    assert out.read_text() == expected
+    cachefile = tmp_path / ".out.json.cache.json"
+    assert cache_filename(str(out)) == str(cachefile)
+
+    # modified
+    data = json.loads(cachefile.read_text())
+    key = "alchemyjsonschema.tests.models:Group"
+    data["entries"][key]["fingerprint"] = "*modified*"
+    data["entries"][key]["schema"]["title"] = "*modified*"
+    cachefile.write_text(json.dumps(data))
+
+    target.run(module_path, str(out), format="json", incremental=True)
+    assert out.read_text() == expected
+
+
+def test_cache__rebuilds_only_changed_models(tmp_path):
+    import json
+    from alchemyjsonschema import SchemaFactory, StructuralWalker
+    from alchemyjsonschema.command._cache import DefinitionsCache
+    from alchemyjsonschema.command._transformer import OpenAPI2Transformer
+    from alchemyjsonschema.tests import models
+
+    filename = str(tmp_path / "cache.json")
+    target = OpenAPI2Transformer(SchemaFactory(StructuralWalker))
+
+    cache = DefinitionsCache(filename, {"walker": "structural"})
+    expected = target.transform(models, depth=None, cache=cache)
+    cache.save()
+    assert len(cache.built) == 6
+
+    cache = DefinitionsCache(filename, {"walker": "structural"})
+    assert target.transform(models, depth=None, cache=cache) == expected
+    assert cache.built == []
+
+    with open(filename) as rf:
+        data = json.load(rf)
+    data["entries"]["alchemyjsonschema.tests.models:User"]["fingerprint"] = "x"
+    with open(filename, "w") as wf:
+        json.dump(data, wf)
+
+    cache = DefinitionsCache(filename, {"walker": "structural"})
+    assert target.transform(models, depth=None, cache=cache) == expected
+    assert cache.built == [models.User]
+
+    # options are changed
+    cache = DefinitionsCache(filename, {"walker": "foreignkey"})
+    target.transform(models, depth=None, cache=cache)
+    assert len(cache.built) == 6
+
+
+def test_it__observer(tmp_path):
+    from alchemyjsonschema.observer import CostCollector
+
+    collector = CostCollector()
+    target = _makeOne("structural", "default", "swagger2.0", observer=collector)
+    target.run("alchemyjsonschema.tests.models", str(tmp_path / "out.json"), "json")
+    assert sorted(collector.costs) == ["A0", "A1", "A2", "Group", "MyModel", "User"]
+    assert all(c.calls == 1 for c in collector.costs.values())
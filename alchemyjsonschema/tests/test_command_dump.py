@@ -0,0 +1,141 @@
+# -*- coding:utf-8 -*-
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.orm import declarative_base
+
+Base = declarative_base()
+
+
+class Item(Base):
+    """string primary key, cannot be split into ranges"""
+
+    __tablename__ = "items"
+    code = sa.Column(sa.String(32), primary_key=True)
+
+
+MODEL = "alchemyjsonschema.tests.models:User"
+
+
+@pytest.fixture
+def url(tmp_path):
+    from sqlalchemy.orm import Session
+    from datetime import datetime
+    from alchemyjsonschema.tests.models import Base, Group, User
+
+    url = "sqlite:///{}".format(tmp_path / "test.db")
+    engine = sa.create_engine(url)
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        groups = [Group(pk=i, name="g{}".format(i), color="red") for i in range(3)]
+        session.add_all(
+            [
+                User(
+                    pk=i * 7,  # sparse
+                    name="u{}".format(i),
+                    group=groups[i % 3],
+                    created_at=datetime(2000, 1, 1) if i % 2 else None,
+                )
+                for i in range(1, 40)
+            ]
+        )
+        session.commit()
+    engine.dispose()
+    return url
+
+
+def _makeOne(*args, **kwargs):
+    from alchemyjsonschema.command.dump import Dumper
+
+    return Dumper(*args, **kwargs)
+
+
+def _expected(url, verbose=False):
+    import json
+    from sqlalchemy.orm import Session
+    from alchemyjsonschema import SchemaFactory, StructuralWalker
+    from alchemyjsonschema.dictify import jsonify
+    from alchemyjsonschema.tests.models import User
+
+    schema = SchemaFactory(StructuralWalker)(User)
+    engine = sa.create_engine(url)
+    with Session(engine) as session:
+        users = session.scalars(sa.select(User).order_by(User.pk))
+        lines = [json.dumps(jsonify(u, schema, verbose=verbose)) for u in users]
+    engine.dispose()
+    return lines
+
+
+def _load(filename):
+    import json
+
+    with open(filename, "rb") as rf:
+        return [json.dumps(json.loads(line)) for line in rf]
+
+
+def test_it(url, tmp_path):
+    out = str(tmp_path / "out.ndjson")
+    _makeOne().run(MODEL, url, out)
+    assert _load(out) == _expected(url)
+
+    _makeOne(verbose=True, chunksize=5).run(MODEL, url, out)
+    assert _load(out) == _expected(url, verbose=True)
+
+
+def test_jobs__same_output(url, tmp_path):
+    serial = tmp_path / "serial.ndjson"
+    parallel = tmp_path / "parallel.ndjson"
+    _makeOne(chunksize=4).run(MODEL, url, str(serial))
+    _makeOne(chunksize=4).run(MODEL, url, str(parallel), jobs=2)
+    assert serial.read_bytes() == parallel.read_bytes()
+    # the parts are removed
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "parallel.ndjson",
+        "serial.ndjson",
+        "test.db",
+    ]
+
+
+def test_gzip(url, tmp_path):
+    import gzip
+
+    plain = tmp_path / "out.ndjson"
+    _makeOne().run(MODEL, url, str(plain))
+    for jobs in [1, 3]:
+        out = tmp_path / "out.ndjson.gz"
+        _makeOne().run(MODEL, url, str(out), jobs=jobs, compress=True)
+        with gzip.open(str(out)) as rf:
+            assert rf.read() == plain.read_bytes()
+
+
+def test_split(url):
+    from alchemyjsonschema.tests.models import User
+
+    ranges = _makeOne().split(User, url, 4)
+    assert ranges == [(7, 74), (74, 141), (141, 208), (208, 274)]
+
+
+def test_split__not_integer_primary_key():
+    from alchemyjsonschema.command.dump import PartitionError
+
+    with pytest.raises(PartitionError):
+        _makeOne().split(Item, "sqlite://", 2)
+
+
+def test_main(url, capsysbinary):
+    import json
+    from alchemyjsonschema.command.main import main
+
+    main(["dump", MODEL, url])
+    out = capsysbinary.readouterr().out
+    assert [json.dumps(json.loads(line)) for line in out.splitlines()] == _expected(url)
+
+    with pytest.raises(SystemExit):
+        main(
+            [
+                "dump",
+                "alchemyjsonschema.tests.test_command_dump:Item",
+                url,
+                "--jobs",
+                "2",
+            ]
+        )
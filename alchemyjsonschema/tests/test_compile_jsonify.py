@@ -0,0 +1,142 @@
+# -*- coding:utf-8 -*-
+def _callFUT(*args, **kwargs):
+    from alchemyjsonschema.dictify import compile_jsonify
+
+    return compile_jsonify(*args, **kwargs)
+
+
+def _makeGroup():
+    from alchemyjsonschema.tests.models import Group, User
+    from datetime import datetime
+
+    created_at = datetime(2000, 1, 1)
+    users = [
+        User(name="foo", created_at=created_at),
+        User(name="boo", created_at=None),
+    ]
+    return Group(name="ravenclaw", color="blue", users=users, created_at=created_at)
+
+
+def test_it__same_as_jsonify():
+    from alchemyjsonschema import SchemaFactory, StructuralWalker
+    from alchemyjsonschema.dictify import jsonify
+    from alchemyjsonschema.tests.models import Group
+
+    schema = SchemaFactory(StructuralWalker)(Group)
+    group = _makeGroup()
+
+    plan = _callFUT(schema)
+    assert plan(group) == jsonify(group, schema)
+    assert plan(group, verbose=True) == jsonify(group, schema, verbose=True)
+    assert plan(group, verbose=True) == {
+        "name": "ravenclaw",
+        "created_at": "2000-01-01T00:00:00+00:00",
+        "color": "blue",
+        "pk": None,
+        "users": [
+            {"name": "foo", "created_at": "2000-01-01T00:00:00+00:00", "pk": None},
+            {"name": "boo", "created_at": None, "pk": None},
+        ],
+    }
+
+
+def test_it__nested_object():
+    from alchemyjsonschema import SchemaFactory, StructuralWalker
+    from alchemyjsonschema.dictify import jsonify
+    from alchemyjsonschema.tests.models import User
+
+    schema = SchemaFactory(StructuralWalker)(User)
+    group = _makeGroup()
+    user = group.users[0]
+
+    plan = _callFUT(schema)
+    assert plan(user) == jsonify(user, schema)
+    assert plan(User(name="foo")) == {"name": "foo"}
+
+
+def test_it__recursive_definitions():
+    from alchemyjsonschema.dictify import JsonifyPlan
+
+    schema = {
+        "title": "Node",
+        "definitions": {
+            "Node": {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string"},
+                    "parent": {"$ref": "#/definitions/Node"},
+                },
+            }
+        },
+        "properties": {"parent": {"$ref": "#/definitions/Node"}},
+    }
+
+    class Node(object):
+        def __init__(self, name, parent=None):
+            self.name = name
+            self.parent = parent
+
+    plan = _callFUT(schema)
+    assert isinstance(plan, JsonifyPlan)
+    result = plan(Node("c", Node("b", Node("a"))))
+    assert result == {"parent": {"name": "b", "parent": {"name": "a"}}}
+
+
+def test_it__unknown_format__raise_error_when_called():
+    import pytest
+    from alchemyjsonschema.dictify import ConvertionError
+
+    schema = {"properties": {"mail": {"type": "string", "format": "email"}}}
+
+    class Ob(object):
+        mail = "foo@example.com"
+
+    plan = _callFUT(schema)
+    with pytest.raises(ConvertionError):
+        plan(Ob())
+
+
+def test_mapping__plan_is_reused():
+    from alchemyjsonschema import SchemaFactory, StructuralWalker
+    from alchemyjsonschema.mapping import Draft4MappingFactory
+    from alchemyjsonschema.tests import models
+
+    factory = Draft4MappingFactory(SchemaFactory(StructuralWalker), models)
+    mapping = factory(models.Group)
+
+    group = _makeGroup()
+    assert mapping.jsondict_from_object(group) == mapping.jsondict_from_object(group)
+    assert mapping.jsonify_plan is mapping.jsonify_plan
+
+
+def test_it__decorated_converter():
+    import functools
+    from alchemyjsonschema.dictify import jsonify_dict
+
+    def upper(fn):
+        @functools.wraps(fn)
+        def wrapper(ob):
+            return fn(ob).upper()
+
+        return wrapper
+
+    @functools.lru_cache(maxsize=None)
+    def color(ob):
+        return "no color" if ob is None else ob
+
+    registry = jsonify_dict.copy()
+    registry[("string", None)] = upper(str)  # has __wrapped__, None is passed
+    registry[("string", "color")] = color
+    schema = {
+        "properties": {
+            "name": {"type": "string"},
+            "color": {"type": "string", "format": "color"},
+        }
+    }
+
+    class Ob(object):
+        name = None
+        color = None
+
+    plan = _callFUT(schema, registry=registry)
+    assert plan(Ob()) == {"name": "NONE", "color": "no color"}
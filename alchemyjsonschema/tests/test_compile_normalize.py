@@ -0,0 +1,70 @@
+# -*- coding:utf-8 -*-
+def _callFUT(*args, **kwargs):
+    from alchemyjsonschema.dictify import compile_normalize
+
+    return compile_normalize(*args, **kwargs)
+
+
+def _makeSchema(model):
+    from alchemyjsonschema import SchemaFactory, StructuralWalker
+
+    return SchemaFactory(StructuralWalker)(model)
+
+
+def test_it__same_as_normalize():
+    from alchemyjsonschema.dictify import normalize
+    from alchemyjsonschema.tests.models import Group
+
+    schema = _makeSchema(Group)
+    group_dict = {
+        "name": "ravenclaw",
+        "created_at": "2000-01-01T00:00:00+00:00",
+        "color": "blue",
+        "pk": None,
+        "users": [
+            {"name": "foo", "created_at": "2000-01-01T00:00:00+00:00", "pk": "1"},
+            {"name": "boo", "created_at": None},
+        ],
+    }
+
+    plan = _callFUT(schema)
+    result = plan(group_dict)
+    assert result == normalize(group_dict, schema)
+    assert result["users"][0]["pk"] == 1
+    assert result["users"][1] == {"name": "boo", "created_at": None}
+
+
+def test_it__partial():
+    from alchemyjsonschema.dictify import normalize
+    from alchemyjsonschema.tests.models import User
+
+    schema = _makeSchema(User)
+    plan = _callFUT(schema)
+
+    for params in [{"name": "foo"}, {"name": "foo", "group": {"name": "g"}}]:
+        assert plan(params) == normalize(params, schema)
+    assert plan({"name": "foo"}) == {"name": "foo", "group": None}
+
+
+def test_it__convertion_error():
+    import pytest
+    from alchemyjsonschema.dictify import ConvertionError
+    from alchemyjsonschema.tests.models import Group
+
+    plan = _callFUT(_makeSchema(Group))
+    with pytest.raises(ConvertionError) as excinfo:
+        plan({"users": [{"pk": "xxx"}]})
+    assert excinfo.value.name == "pk"
+
+
+def test_mapping():
+    from alchemyjsonschema import SchemaFactory, StructuralWalker
+    from alchemyjsonschema.mapping import Draft4MappingFactory
+    from alchemyjsonschema.tests import models
+
+    factory = Draft4MappingFactory(SchemaFactory(StructuralWalker), models)
+    mapping = factory(models.User)
+
+    result = mapping.dict_from_jsondict({"pk": "10", "name": "foo"})
+    assert result == {"pk": 10, "name": "foo", "group": None}
+    assert mapping.normalize_plan is mapping.normalize_plan
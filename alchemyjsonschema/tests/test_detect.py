@@ -92,3 +92,53 @@ def test_detect__adjust_required():
         adjust_required=lambda prop, default: False if prop.key == "pk" else default,
     )
     assert result == []
+
+
+def test_detect__cached_per_mapper():
+    from alchemyjsonschema import StructuralWalker
+
+    class Model5(Base):
+        __tablename__ = "Model5"
+        pk = sa.Column(sa.Integer, primary_key=True, doc="primary key")
+        name = sa.Column(sa.String(255), nullable=False)
+
+    target = _makeOne(StructuralWalker)
+    walker = target.walker(Model5)
+    assert target._detect_required(walker) == ["pk", "name"]
+    assert len(walker.plan.required) == 1
+
+    result = target._detect_required(target.walker(Model5))
+    assert result == ["pk", "name"]
+    assert len(walker.plan.required) == 1
+
+    result = target._detect_required(target.walker(Model5, excludes=["name"]))
+    assert result == ["pk"]
+    assert len(walker.plan.required) == 2
+
+
+def test_detect__cached__history_and_adjust_required():
+    import sqlalchemy.orm as orm
+    from alchemyjsonschema import StructuralWalker
+
+    class Model6(Base):
+        __tablename__ = "Model6"
+        pk = sa.Column(sa.Integer, primary_key=True, doc="primary key")
+
+    class Model7(Base):
+        __tablename__ = "Model7"
+        pk = sa.Column(sa.Integer, primary_key=True, doc="primary key")
+        parent_id = sa.Column(sa.Integer, sa.ForeignKey(Model6.pk))
+        parent = orm.relationship(Model6)
+
+    target = _makeOne(StructuralWalker)
+
+    def adjust_required(prop, default):
+        return True if prop.key == "parent" else default
+
+    walker = target.walker(Model7)
+    result = target._detect_required(walker, adjust_required=adjust_required)
+    assert result == ["pk", "parent"]
+
+    walker = target.walker(Model7, history=[Model7.parent.property])
+    result = target._detect_required(walker, adjust_required=adjust_required)
+    assert result == ["pk"]
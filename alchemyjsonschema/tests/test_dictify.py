@@ -81,10 +81,9 @@ def test_it__dictify2():
 def test_it__normalize():
     from alchemyjsonschema import SchemaFactory, StructuralWalker
     from alchemyjsonschema.tests.models import Group
-    from datetime import datetime
-    import pytz
+    from datetime import datetime, timezone
 
-    created_at = datetime(2000, 1, 1, 0, 0, 0, 0, pytz.utc)
+    created_at = datetime(2000, 1, 1, 0, 0, 0, 0, timezone.utc)
 
     factory = SchemaFactory(StructuralWalker)
     group_schema = factory(Group)
@@ -0,0 +1,164 @@
+# -*- coding:utf-8 -*-
+import importlib.util
+import pytest
+
+has_orjson = importlib.util.find_spec("orjson") is not None
+backends = [
+    "json",
+    pytest.param("orjson", marks=pytest.mark.skipif(not has_orjson, reason="orjson")),
+]
+
+
+def _makeGroups(n):
+    from alchemyjsonschema.tests.models import Group, User
+    from datetime import datetime, timezone, timedelta
+
+    tz = timezone(timedelta(hours=9))
+    return [
+        Group(
+            pk=i,
+            name="group{}".format(i),
+            color="red",
+            created_at=datetime(2000, 1, 1, 0, 0, 0, i),
+            users=[
+                User(
+                    pk=i,
+                    name="user{}".format(i),
+                    created_at=datetime(2000, 1, 1, tzinfo=tz),
+                ),
+                User(pk=i + n, name="ユーザー"),
+            ],
+        )
+        for i in range(n)
+    ]
+
+
+def _makeMapping(encoder):
+    from alchemyjsonschema import SchemaFactory, StructuralWalker
+    from alchemyjsonschema.mapping import Draft4MappingFactory
+    from alchemyjsonschema.tests import models
+
+    factory = Draft4MappingFactory(
+        SchemaFactory(StructuralWalker), models, encoder=encoder
+    )
+    return factory(models.Group)
+
+
+@pytest.mark.parametrize("encoder", backends)
+def test_same_as_jsondict(encoder):
+    import json
+
+    mapping = _makeMapping(encoder)
+    assert mapping.encoder.name == encoder
+
+    groups = _makeGroups(3)
+    for verbose in [False, True]:
+        for g in groups:
+            result = mapping.json_from_object(g, verbose=verbose)
+            assert isinstance(result, bytes)
+            assert json.loads(result) == mapping.jsondict_from_object(
+                g, verbose=verbose
+            )
+
+        result = mapping.json_from_objects(groups, verbose=verbose)
+        expected = [mapping.jsondict_from_object(g, verbose=verbose) for g in groups]
+        assert json.loads(result) == expected
+
+
+def test_same_bytes():
+    pytest.importorskip("orjson")
+    groups = _makeGroups(3)
+    expected = _makeMapping("json").json_from_objects(groups)
+    assert _makeMapping("orjson").json_from_objects(groups) == expected
+
+
+def test_native_values_are_not_converted():
+    import uuid
+    from datetime import datetime, date
+    from alchemyjsonschema.dictify import jsonify_dict, compile_jsonify
+    from alchemyjsonschema.encoder import OrjsonBackend
+
+    pytest.importorskip("orjson")
+    backend = OrjsonBackend()
+    schema = {
+        "type": "object",
+        "properties": {
+            "id": {"type": "string"},
+            "created_at": {"type": "string", "format": "date-time"},
+            "day": {"type": "string", "format": "date"},
+        },
+    }
+    plan = compile_jsonify(schema, registry=backend.jsonify_registry(jsonify_dict))
+
+    class Obj:
+        id = uuid.UUID(int=1)
+        created_at = datetime(2000, 1, 1)
+        day = date(2000, 1, 1)
+
+    D = plan(Obj)
+    assert D == {"id": Obj.id, "created_at": Obj.created_at, "day": Obj.day}
+    assert backend.dumps(D) == (
+        b'{"id":"00000000-0000-0000-0000-000000000001",'
+        b'"created_at":"2000-01-01T00:00:00+00:00","day":"2000-01-01"}'
+    )
+
+
+@pytest.mark.parametrize("encoder", backends)
+def test_default(encoder):
+    import uuid
+    from decimal import Decimal
+    from datetime import datetime
+    from alchemyjsonschema.encoder import get_encoder
+
+    backend = get_encoder(encoder)
+    D = {"id": uuid.UUID(int=1), "n": Decimal("0.5"), "at": datetime(2000, 1, 1)}
+    assert backend.dumps(D) == (
+        b'{"id":"00000000-0000-0000-0000-000000000001",'
+        b'"n":0.5,"at":"2000-01-01T00:00:00+00:00"}'
+    )
+    with pytest.raises(TypeError):
+        backend.dumps({"x": object()})
+
+
+def test_get_encoder__auto_detected():
+    from alchemyjsonschema.encoder import get_encoder
+
+    expected = "orjson" if has_orjson else "json"
+    assert get_encoder().name == expected
+    assert _makeMapping(None).encoder.name == expected
+
+
+def test_jsonify_registry__custom_converters():
+    import functools
+    import uuid
+    from datetime import datetime
+    from alchemyjsonschema.dictify import jsonify_dict, compile_jsonify, maybe_wrap
+    from alchemyjsonschema.encoder import OrjsonBackend
+
+    pytest.importorskip("orjson")
+
+    @functools.lru_cache(maxsize=None)
+    def text(ob):
+        return "-" if ob is None else str(ob)
+
+    registry = jsonify_dict.copy()
+    registry[("string", None)] = text
+    registry[("string", "date-time")] = maybe_wrap(lambda ob: ob.strftime("%Y"))
+    schema = {
+        "type": "object",
+        "properties": {
+            "id": {"type": "string"},
+            "name": {"type": "string"},
+            "created_at": {"type": "string", "format": "date-time"},
+        },
+    }
+    backend = OrjsonBackend()
+    plan = compile_jsonify(schema, registry=backend.jsonify_registry(registry))
+
+    class Obj:
+        id = uuid.UUID(int=1)
+        name = None
+        created_at = datetime(2000, 1, 1)
+
+    # the custom converters are kept (only the default ones are encoded natively)
+    assert plan(Obj) == {"id": Obj.id, "name": "-", "created_at": "2000"}
@@ -0,0 +1,45 @@
+# -*- coding:utf-8 -*-
+def _callFUT(*args, **kwargs):
+    from alchemyjsonschema.fingerprint import fingerprint
+
+    return fingerprint(*args, **kwargs)
+
+
+def _makeModel(**columns):
+    import sqlalchemy as sa
+    from sqlalchemy.ext.declarative import declarative_base
+
+    Base = declarative_base()
+    attrs = {"__tablename__": "Model", "pk": sa.Column(sa.Integer, primary_key=True)}
+    attrs.update(columns)
+    return type("Model", (Base,), attrs)
+
+
+def test_it__stable():
+    import sqlalchemy as sa
+    from datetime import datetime
+
+    def make():
+        return _makeModel(
+            name=sa.Column(sa.String(255), default="", nullable=False),
+            created_at=sa.Column(sa.DateTime, default=datetime.now),
+        )
+
+    assert _callFUT(make()) == _callFUT(make())
+
+
+def test_it__changed():
+    import sqlalchemy as sa
+
+    base = _callFUT(_makeModel(name=sa.Column(sa.String(255))))
+    assert base != _callFUT(_makeModel(name=sa.Column(sa.String(100))))
+    assert base != _callFUT(_makeModel(name=sa.Column(sa.String(255), nullable=False)))
+    assert base != _callFUT(_makeModel(name=sa.Column(sa.String(255), doc="name")))
+    assert base != _callFUT(_makeModel(name=sa.Column(sa.String(255), default="")))
+
+
+def test_related_models():
+    from alchemyjsonschema.fingerprint import related_models
+    from alchemyjsonschema.tests.models import A0, A1, A2
+
+    assert related_models([A2]) == [A2, A1, A0]
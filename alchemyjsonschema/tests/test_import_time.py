@@ -0,0 +1,78 @@
+# -*- coding:utf-8 -*-
+"""
+import time of the package and the command (`--help`).
+the heavy modules are not imported (the time itself is not checked, it is not stable)
+"""
+
+import json
+import subprocess
+import sys
+
+HEAVY_MODULES = [
+    "sqlalchemy.dialects.postgresql",
+    "jsonschema",
+    "isodate",
+    "pytz",
+    "dictknife",
+    "magicalimport",
+]
+
+IMPORTED = """
+import json, sys
+{code}
+print(json.dumps(sorted(sys.modules)))
+"""
+
+HELP = """
+import contextlib, io
+sys.argv = ["alchemyjsonschema", "--help"]
+from alchemyjsonschema.command.main import main
+with contextlib.redirect_stdout(io.StringIO()):
+    try:
+        main()
+    except SystemExit:
+        pass
+"""
+
+
+def _imported(code):
+    output = subprocess.check_output([sys.executable, "-c", IMPORTED.format(code=code)])
+    return json.loads(output.decode("utf-8"))
+
+
+def test_import():
+    modules = _imported(
+        "import alchemyjsonschema, alchemyjsonschema.mapping, alchemyjsonschema.dictify"
+    )
+    assert [m for m in HEAVY_MODULES if m in modules] == []
+
+
+def test_help():
+    modules = _imported(HELP)
+    assert [m for m in HEAVY_MODULES if m in modules] == []
+
+
+def test_format_checker__custom_formats_are_registered():
+    from alchemyjsonschema import SchemaFactory, StructuralWalker
+    from alchemyjsonschema.mapping import Draft4MappingFactory
+    from alchemyjsonschema.tests import models
+
+    factory = Draft4MappingFactory(SchemaFactory(StructuralWalker), models)
+    assert factory.format_checker.conforms("10:00:00", "time")
+    assert not factory.format_checker.conforms("25:00:00", "time")
+    assert not factory.format_checker.conforms("2000-13-01", "date")
+
+
+def test_format_checker__passed():
+    # in subprocess, the formats are registered globally (by the other tests)
+    code = """
+from jsonschema import FormatChecker
+from alchemyjsonschema import SchemaFactory, StructuralWalker
+from alchemyjsonschema.mapping import Draft4MappingFactory
+from alchemyjsonschema.tests import models
+
+checker = FormatChecker()
+Draft4MappingFactory(SchemaFactory(StructuralWalker), models, format_checker=checker)
+assert checker.conforms("10:00:00Z", "time")  # the builtin one rejects this
+"""
+    subprocess.check_call([sys.executable, "-c", code])
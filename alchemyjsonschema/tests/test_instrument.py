@@ -0,0 +1,167 @@
+# -*- coding:utf-8 -*-
+import pytest
+
+
+@pytest.fixture
+def session():
+    import sqlalchemy as sa
+    from sqlalchemy.orm import Session
+    from alchemyjsonschema.tests.models import Base, Group, User, A0, A1, A2
+
+    engine = sa.create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        for i in range(3):
+            group = Group(pk=i, name="g", color="red")
+            session.add_all(
+                [User(pk=i * 2 + j, name="u", group=group) for j in range(2)]
+            )
+            a1 = A1(pk=i, name="a1", children=[A2(pk=i, name="a2")])
+            session.add(A0(pk=i, name="a0", children=[a1]))
+        session.commit()
+        session.expunge_all()
+        yield session
+
+
+def _makeSchema(model):
+    from alchemyjsonschema import SchemaFactory, StructuralWalker
+
+    return SchemaFactory(StructuralWalker)(model)
+
+
+def test_lazy_loads(session):
+    import sqlalchemy as sa
+    from alchemyjsonschema.dictify import jsonify
+    from alchemyjsonschema.instrument import Instrumentation
+    from alchemyjsonschema.tests.models import A0
+
+    schema = _makeSchema(A0)
+    instrument = Instrumentation()
+    for a0 in session.scalars(sa.select(A0)).all():
+        assert instrument.jsonify(a0, schema) == jsonify(a0, schema)
+        report = instrument.last_report
+        assert report.name == "A0"
+        assert (report.statements, report.lazy_loads) == (2, 2)
+        assert report.paths == {"children": 1, "children.children": 1}
+        assert [e.kind for e in report.events] == ["relationship", "relationship"]
+
+
+def test_no_lazy_loads__with_loader_options(session):
+    import sqlalchemy as sa
+    from alchemyjsonschema.instrument import Instrumentation
+    from alchemyjsonschema.loading import loader_options
+    from alchemyjsonschema.tests.models import A0
+
+    schema = _makeSchema(A0)
+    instrument = Instrumentation(strict=True)
+    stmt = sa.select(A0).options(*loader_options(A0, schema))
+    for a0 in session.scalars(stmt).all():
+        instrument.jsonify(a0, schema)
+        assert instrument.last_report.statements == 0
+
+
+def test_strict(session):
+    import sqlalchemy as sa
+    from alchemyjsonschema.instrument import Instrumentation, LazyLoadError
+    from alchemyjsonschema.tests.models import User
+
+    schema = _makeSchema(User)
+    user = session.scalars(sa.select(User)).first()
+    with pytest.raises(LazyLoadError) as e:
+        Instrumentation(strict=True).dictify(user, schema)
+    assert e.value.path == "group"
+
+
+def test_track(session):
+    import sqlalchemy as sa
+    from alchemyjsonschema.instrument import Instrumentation
+    from alchemyjsonschema.tests.models import User
+
+    instrument = Instrumentation()
+    with instrument.track("users") as report:
+        users = session.scalars(sa.select(User)).all()
+        [u.group for u in users]
+    assert report is instrument.last_report
+    assert (report.statements, report.lazy_loads) == (1 + 3, 3)
+    assert report.paths == {"": 3}
+
+    # not tracked
+    session.expunge_all()
+    session.scalars(sa.select(User)).all()
+    assert report.statements == 4
+
+
+def test_mapping(session):
+    import sqlalchemy as sa
+    from alchemyjsonschema import SchemaFactory, StructuralWalker
+    from alchemyjsonschema.mapping import Draft4MappingFactory
+    from alchemyjsonschema.instrument import Instrumentation
+    from alchemyjsonschema.tests import models
+
+    reports = []
+    instrument = Instrumentation(on_report=reports.append)
+    factory = Draft4MappingFactory(
+        SchemaFactory(StructuralWalker), models, instrument=instrument
+    )
+    mapping = factory(models.User)
+    users = session.scalars(sa.select(models.User).order_by(models.User.pk)).all()
+    mapping.jsondict_from_object(users[0])
+    mapping.dict_from_object(users[2])
+    assert [r.asdict() for r in reports] == [
+        {"name": "User", "statements": 1, "lazy_loads": 1, "paths": {"group": 1}}
+    ] * 2
+
+    instrument.sample_rate = 0.0  # not sampled
+    mapping.jsondict_from_object(users[4])
+    assert len(reports) == 2
+
+
+def test_mapping__other_methods(session):
+    import io
+    import sqlalchemy as sa
+    from alchemyjsonschema import SchemaFactory, StructuralWalker
+    from alchemyjsonschema.mapping import Draft4MappingFactory
+    from alchemyjsonschema.instrument import Instrumentation
+    from alchemyjsonschema.tests import models
+
+    reports = []
+    instrument = Instrumentation(on_report=reports.append)
+    factory = Draft4MappingFactory(
+        SchemaFactory(StructuralWalker), models, instrument=instrument
+    )
+    mapping = factory(models.User)
+
+    def users():
+        session.expunge_all()
+        stmt = sa.select(models.User).order_by(models.User.pk).limit(2)
+        return session.scalars(stmt).all()
+
+    expected = {"name": "User", "statements": 1, "lazy_loads": 1, "paths": {"": 1}}
+    mapping.json_from_object(users()[0])
+    assert [r.asdict() for r in reports] == [expected]
+
+    reports.clear()
+    mapping.json_from_objects(users())
+    mapping.dump_objects(users(), io.StringIO())
+    list(mapping.jsondicts_from_objects(users()))
+    list(mapping.iterencode_objects(users()))
+    # users 0 and 1 are in the same group
+    assert [r.asdict() for r in reports] == [expected] * 4
+
+    # the generators are tracked while the items are produced
+    reports.clear()
+    obs = users()
+    it = mapping.jsondicts_from_objects(obs, chunksize=1)
+    next(it)
+    with instrument.track("outside") as report:
+        session.scalars(sa.select(models.User)).all()
+    assert report.statements == 1
+    list(it)
+    assert [r.name for r in reports] == ["outside", "User"]
+    assert reports[1].statements == 1
+
+    instrument.sample_rate = 0.0  # not sampled
+    reports.clear()
+    list(mapping.jsondicts_from_objects(users()))
+    mapping.json_from_objects(users())
+    assert reports == []
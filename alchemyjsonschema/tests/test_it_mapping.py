@@ -6,11 +6,10 @@ jsondict <-> dict <-> model object
 
 
 def _datetime(*args):
-    import pytz
-    from datetime import datetime
+    from datetime import datetime, timezone
 
     args = list(args)
-    args.append(pytz.utc)
+    args.append(timezone.utc)
     return datetime(*args)
 
 
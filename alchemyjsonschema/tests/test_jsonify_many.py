@@ -0,0 +1,252 @@
+# -*- coding:utf-8 -*-
+def _callFUT(*args, **kwargs):
+    from alchemyjsonschema.dictify import jsonify_many
+
+    return jsonify_many(*args, **kwargs)
+
+
+def _makeGroups(n):
+    from alchemyjsonschema.tests.models import Group, User
+    from datetime import datetime
+
+    created_at = datetime(2000, 1, 1)
+    groups = []
+    for i in range(n):
+        users = [
+            User(pk=j, name="user{}".format(j), created_at=created_at) for j in range(i)
+        ]
+        groups.append(Group(pk=i, name="group{}".format(i), users=users))
+    return groups
+
+
+def test_it__same_as_jsonify():
+    from alchemyjsonschema import SchemaFactory, StructuralWalker
+    from alchemyjsonschema.dictify import jsonify
+    from alchemyjsonschema.tests.models import Group
+
+    schema = SchemaFactory(StructuralWalker)(Group)
+    groups = _makeGroups(5)
+
+    result = list(_callFUT(groups, schema, chunksize=2))
+    assert result == [jsonify(g, schema) for g in groups]
+
+    result = list(_callFUT(groups, schema, verbose=True, chunksize=2))
+    assert result == [jsonify(g, schema, verbose=True) for g in groups]
+
+
+def test_it__nested_object_and_none():
+    from alchemyjsonschema import SchemaFactory, StructuralWalker
+    from alchemyjsonschema.dictify import jsonify
+    from alchemyjsonschema.tests.models import User, Group
+
+    schema = SchemaFactory(StructuralWalker)(User)
+    users = [User(name="foo", group=Group(name="g")), User(name="boo"), None]
+
+    result = list(_callFUT(users, schema))
+    assert result == [jsonify(u, schema) for u in users]
+    assert result[1] == {"name": "boo"}
+    assert result[2] is None
+
+
+def test_it__generator_is_consumed_lazily():
+    from alchemyjsonschema import SchemaFactory, StructuralWalker
+    from alchemyjsonschema.tests.models import Group
+
+    schema = SchemaFactory(StructuralWalker)(Group)
+    consumed = []
+
+    def gen():
+        for g in _makeGroups(10):
+            consumed.append(g)
+            yield g
+
+    it = _callFUT(gen(), schema, chunksize=3)
+    assert next(it)["name"] == "group0"
+    assert len(consumed) == 3
+
+
+def test_mapping():
+    from alchemyjsonschema import SchemaFactory, StructuralWalker
+    from alchemyjsonschema.mapping import Draft4MappingFactory
+    from alchemyjsonschema.tests import models
+
+    factory = Draft4MappingFactory(SchemaFactory(StructuralWalker), models)
+    mapping = factory(models.Group)
+
+    groups = _makeGroups(3)
+    result = list(mapping.jsondicts_from_objects(iter(groups)))
+    assert result == [mapping.jsondict_from_object(g) for g in groups]
+
+
+def test_column_converters__same_as_converters():
+    from datetime import datetime, date, time, timedelta, timezone
+    from alchemyjsonschema import dictify
+
+    datetimes = [
+        datetime(2000, 1, 1),
+        datetime(2000, 1, 1, 10, 20, 30, 123),
+        datetime(2000, 1, 1, tzinfo=timezone(timedelta(hours=9))),
+    ]
+    for fn, values in [
+        (dictify.datetime_rfc3339, datetimes),
+        (dictify.isoformat0, [date(2000, 1, 1), date(2000, 12, 31)]),
+        (dictify.isoformat, [time(10, 20, 30), time(0, 0, 0, 1)]),
+    ]:
+        convert_column = dictify.jsonify_column_dict[fn]
+        assert convert_column(values) == [fn(v) for v in values]
+
+
+def test_it__with_column_registry():
+    from alchemyjsonschema import SchemaFactory, StructuralWalker
+    from alchemyjsonschema.dictify import jsonify_dict, maybe_wrap
+    from alchemyjsonschema.tests.models import Group
+
+    calls = []
+
+    def upper_column(values):
+        calls.append(values)
+        return [v.upper() for v in values]
+
+    schema = SchemaFactory(StructuralWalker)(Group)
+    groups = _makeGroups(3)
+    groups[1].name = None
+
+    result = list(_callFUT(groups, schema, column_registry={str: upper_column}))
+    assert [g.get("name") for g in result] == ["GROUP0", None, "GROUP2"]
+    assert result[2]["users"][1]["name"] == "USER1"
+    assert ["group0", "group2"] in calls  # once per column, None is skipped
+
+    # not registered converter is mapped one by one
+    registry = dict(jsonify_dict)
+    registry[("string", None)] = maybe_wrap(lambda v: "*" + v)
+    result = list(_callFUT(groups, schema, registry=registry, column_registry={}))
+    assert [g.get("name") for g in result] == ["*group0", None, "*group2"]
+
+
+def _makeUsersWithSharedGroups(n, m):
+    from alchemyjsonschema.tests.models import Group, User
+    from datetime import datetime
+
+    groups = [
+        Group(pk=i, name="group{}".format(i), created_at=datetime(2000, 1, 1))
+        for i in range(m)
+    ]
+    return [User(pk=i, name="user", group=groups[i % m]) for i in range(n)]
+
+
+def test_memoize__same_as_not_memoized():
+    from alchemyjsonschema import SchemaFactory, StructuralWalker
+    from alchemyjsonschema.tests.models import User, A0, A1, A2
+
+    schema = SchemaFactory(StructuralWalker)(User)
+    users = _makeUsersWithSharedGroups(10, 3)
+    for verbose in [False, True]:
+        expected = list(_callFUT(users, schema, verbose=verbose, memoize=False))
+        assert list(_callFUT(users, schema, verbose=verbose, chunksize=4)) == expected
+
+    # the same A2 objects are found via the different parents
+    a2s = [A2(pk=i, name="a2") for i in range(2)]
+    a1s = [A1(pk=i, name="a1", children=a2s) for i in range(3)]
+    schema = SchemaFactory(StructuralWalker)(A0)
+    a0s = [A0(pk=i, name="a0", children=a1s[i:]) for i in range(3)]
+    expected = list(_callFUT(a0s, schema, memoize=False))
+    assert list(_callFUT(a0s, schema)) == expected
+
+
+def test_memoize__converted_once():
+    from alchemyjsonschema import SchemaFactory, StructuralWalker
+    from alchemyjsonschema.dictify import jsonify_dict, maybe_wrap, datetime_rfc3339
+    from alchemyjsonschema.tests.models import User
+
+    called = []
+
+    def convert(ob):
+        called.append(ob)
+        return datetime_rfc3339(ob)
+
+    registry = dict(jsonify_dict)
+    registry[("string", "date-time")] = maybe_wrap(convert)
+
+    schema = SchemaFactory(StructuralWalker)(User)
+    users = _makeUsersWithSharedGroups(10, 3)
+    list(_callFUT(users, schema, registry=registry))
+    assert len(called) == 3
+    list(_callFUT(users, schema, registry=registry, memoize=False))
+    assert len(called) == 3 + 10
+
+    # memoized in each chunk (4 + 4 + 2)
+    del called[:]
+    list(_callFUT(users, schema, registry=registry, chunksize=4))
+    assert len(called) == 3 + 3 + 2
+
+
+def test_memoize__results_are_not_shared():
+    from alchemyjsonschema import SchemaFactory, StructuralWalker
+    from alchemyjsonschema.dictify import compile_jsonify
+    from alchemyjsonschema.tests.models import User
+
+    schema = SchemaFactory(StructuralWalker)(User)
+    users = _makeUsersWithSharedGroups(4, 1)
+    result = list(_callFUT(users, schema))
+    result[0]["group"]["name"] = "changed"
+    assert [d["group"]["name"] for d in result] == ["changed"] + ["group0"] * 3
+
+    # share=True, for encoding the results at once
+    plan = compile_jsonify(schema)
+    result = list(plan.iterate(users, share=True))
+    assert result[0]["group"] is result[1]["group"]
+
+
+def test_memoize__persistent_objects():
+    import sqlalchemy as sa
+    from sqlalchemy.orm import Session
+    from alchemyjsonschema import SchemaFactory, StructuralWalker
+    from alchemyjsonschema.tests.models import Base, User
+
+    engine = sa.create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    schema = SchemaFactory(StructuralWalker)(User)
+    with Session(engine) as session:
+        session.add_all(_makeUsersWithSharedGroups(6, 2))
+        session.commit()
+        users = session.scalars(sa.select(User).order_by(User.pk)).all()
+        expected = list(_callFUT(users, schema, memoize=False))
+        assert list(_callFUT(users, schema, chunksize=4)) == expected
+
+
+def test_it__recursive_definitions():
+    from alchemyjsonschema.dictify import jsonify
+
+    schema = {
+        "title": "Node",
+        "definitions": {
+            "Node": {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string"},
+                    "parent": {"$ref": "#/definitions/Node"},
+                    "children": {
+                        "type": "array",
+                        "items": {"$ref": "#/definitions/Node"},
+                    },
+                },
+            }
+        },
+        "properties": {
+            "name": {"type": "string"},
+            "parent": {"$ref": "#/definitions/Node"},
+            "children": {"type": "array", "items": {"$ref": "#/definitions/Node"}},
+        },
+    }
+
+    class Node(object):
+        def __init__(self, name, parent=None, children=None):
+            self.name = name
+            self.parent = parent
+            self.children = children or []
+
+    nodes = [Node("c", Node("b", Node("a"))), Node("x", children=[Node("y")]), None]
+    for memoize in [False, True]:
+        result = list(_callFUT(nodes, schema, memoize=memoize))
+        assert result == [jsonify(n, schema) for n in nodes]
+        assert list(_callFUT([], schema, memoize=memoize)) == []
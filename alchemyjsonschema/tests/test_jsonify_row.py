@@ -0,0 +1,162 @@
+# -*- coding:utf-8 -*-
+import pytest
+
+
+@pytest.fixture
+def conn():
+    import sqlalchemy as sa
+    from datetime import datetime
+    from alchemyjsonschema.tests.models import Base, Group, User
+
+    engine = sa.create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with engine.connect() as conn:
+        conn.execute(
+            sa.insert(Group.__table__).values(pk=1, name="g", color="red"),
+        )
+        conn.execute(
+            sa.insert(User.__table__),
+            [
+                dict(pk=1, name="foo", group_id=1, created_at=datetime(2000, 1, 1)),
+                dict(pk=2, name="bar", group_id=2, created_at=None),  # no group
+            ],
+        )
+        yield conn
+
+
+def _getSchema():
+    from alchemyjsonschema import SchemaFactory, StructuralWalker
+    from alchemyjsonschema.tests.models import User
+
+    return SchemaFactory(StructuralWalker)(User)
+
+
+def _select(conn, outer=False):
+    import sqlalchemy as sa
+    from alchemyjsonschema.tests.models import Group, User
+
+    stmt = (
+        sa.select(
+            User.pk,
+            User.name,
+            User.created_at,
+            Group.pk.label("group.pk"),
+            Group.name.label("group.name"),
+            Group.color.label("group.color"),
+        )
+        .select_from(User)
+        .join(Group, isouter=outer)
+        .order_by(User.pk)
+    )
+    return conn.execute(stmt)
+
+
+def test_jsonify__row(conn):
+    from alchemyjsonschema.dictify import jsonify
+
+    row = _select(conn).first()
+    expected = {
+        "pk": 1,
+        "name": "foo",
+        "created_at": "2000-01-01T00:00:00+00:00",
+        "group": {"pk": 1, "name": "g", "color": "red"},
+    }
+    assert jsonify(row, _getSchema()) == expected
+    assert jsonify(row._mapping, _getSchema()) == expected
+
+
+def test_jsonify__same_as_object(conn):
+    from alchemyjsonschema.dictify import jsonify
+    from alchemyjsonschema.tests.models import Group, User
+
+    row = _select(conn).first()
+    user = User(pk=1, name="foo", created_at=row.created_at)
+    user.group = Group(pk=1, name="g", color="red")
+
+    schema = _getSchema()
+    assert jsonify(row, schema) == jsonify(user, schema)
+    assert jsonify(row, schema, verbose=True) == jsonify(user, schema, verbose=True)
+
+
+def test_jsonify_rows__outer_join(conn):
+    from alchemyjsonschema.dictify import jsonify_rows
+
+    result = list(jsonify_rows(_select(conn, outer=True), _getSchema()))
+    assert [d["pk"] for d in result] == [1, 2]
+    assert result[0]["group"]["name"] == "g"
+    assert "group" not in result[1]
+
+    result = list(jsonify_rows(_select(conn, outer=True), _getSchema(), verbose=True))
+    assert result[1]["group"] is None
+    assert result[1]["created_at"] is None
+
+
+def test_jsonify_rows__flat_and_iterable_of_rows(conn):
+    import sqlalchemy as sa
+    from alchemyjsonschema.dictify import jsonify_rows
+    from alchemyjsonschema.tests.models import User
+
+    rows = conn.execute(sa.select(User.pk, User.name).order_by(User.pk)).all()
+    result = list(jsonify_rows(rows, _getSchema()))
+    assert result == [{"pk": 1, "name": "foo"}, {"pk": 2, "name": "bar"}]
+
+
+def test_jsonify_row__nested_values():
+    # e.g. json_agg(), json_build_object() on postgresql
+    from alchemyjsonschema import SchemaFactory, StructuralWalker
+    from alchemyjsonschema.dictify import jsonify_row
+    from alchemyjsonschema.tests.models import Group
+
+    schema = SchemaFactory(StructuralWalker)(Group)
+    row = {"pk": 1, "name": "g", "users": [{"pk": 1, "name": "foo"}]}
+    result = jsonify_row(row, schema)
+    assert result == {"pk": 1, "name": "g", "users": [{"pk": 1, "name": "foo"}]}
+
+
+def test_jsonify_row__verbose__missing_array():
+    from alchemyjsonschema import SchemaFactory, StructuralWalker
+    from alchemyjsonschema.dictify import jsonify, jsonify_row
+    from alchemyjsonschema.tests.models import Group
+
+    schema = SchemaFactory(StructuralWalker)(Group)
+    row = {"pk": 1, "name": "g", "color": "red", "created_at": None}
+    # same as the object, having no users
+    expected = jsonify(Group(**row), schema, verbose=True)
+    assert expected["users"] == []
+    assert jsonify_row(row, schema, verbose=True) == expected
+    assert "users" not in jsonify_row(row, schema)
+
+
+def test_jsonify__plan_is_cached(conn, monkeypatch):
+    from alchemyjsonschema import dictify
+
+    compiled = []
+    compile_jsonify = dictify.compile_jsonify
+
+    def counting(*args, **kwargs):
+        compiled.append(args)
+        return compile_jsonify(*args, **kwargs)
+
+    monkeypatch.setattr(dictify, "compile_jsonify", counting)
+    schema = _getSchema()
+    rows = _select(conn).all()
+    results = [dictify.jsonify(row, schema) for row in rows]
+    assert results == list(dictify.jsonify_rows(rows, schema))
+    assert len(compiled) == 1
+
+    dictify.jsonify(rows[0], _getSchema())  # another schema
+    assert len(compiled) == 2
+
+
+def test_mapping(conn):
+    from alchemyjsonschema import SchemaFactory, StructuralWalker
+    from alchemyjsonschema.mapping import Draft4MappingFactory
+    from alchemyjsonschema.tests import models
+
+    factory = Draft4MappingFactory(SchemaFactory(StructuralWalker), models)
+    mapping = factory(models.User)
+
+    result = list(mapping.jsondicts_from_rows(_select(conn, outer=True)))
+    assert len(result) == 2
+    row = _select(conn).first()
+    assert mapping.jsondict_from_row(row) == result[0]
@@ -0,0 +1,152 @@
+# -*- coding:utf-8 -*-
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.orm import declarative_base, relationship
+
+Base = declarative_base()
+
+
+class Q(Base):
+    __tablename__ = "q"
+    pk = sa.Column(sa.Integer, primary_key=True)
+
+
+class R(Base):
+    __tablename__ = "r"
+    pk = sa.Column(sa.Integer, primary_key=True)
+    q_id = sa.Column(sa.Integer, sa.ForeignKey(Q.pk))
+    q = relationship(Q, backref="rs")
+
+
+class P(Base):
+    """two paths to Q (e.g. created_by, updated_by)"""
+
+    __tablename__ = "p"
+    pk = sa.Column(sa.Integer, primary_key=True)
+    a_id = sa.Column(sa.Integer, sa.ForeignKey(Q.pk))
+    b_id = sa.Column(sa.Integer, sa.ForeignKey(Q.pk))
+    a = relationship(Q, foreign_keys=[a_id], backref="p_a")
+    b = relationship(Q, foreign_keys=[b_id], backref="p_b")
+
+
+def _makeOne(*args, **kwargs):
+    from alchemyjsonschema import SchemaFactory, StructuralWalker
+
+    return SchemaFactory(StructuralWalker, *args, **kwargs)
+
+
+def _pending(schema):
+    return sorted(schema["definitions"].pending)
+
+
+@pytest.mark.parametrize("depth", [None, 1, 2, 3])
+def test_it__same_as_eager(depth):
+    import json
+    from alchemyjsonschema.tests.models import Group, User, A0, A1, A2
+
+    factory = _makeOne()
+    for model in [Group, User, A0, A1, A2]:
+        expected = factory(model, depth=depth)
+        assert factory(model, depth=depth, lazy=True) == expected
+        result = json.loads(json.dumps(factory(model, depth=depth, lazy=True)))
+        assert result == expected
+
+
+@pytest.mark.parametrize("depth", [None, 1, 2, 3])
+def test_it__same_as_eager__multiple_paths(depth):
+    import json
+
+    factory = _makeOne()
+    for model in [P, Q, R]:
+        expected = json.dumps(factory(model, depth=depth))
+        assert json.dumps(factory(model, depth=depth, lazy=True)) == expected
+
+    # the last path is used (P.b, so Q.p_b is excluded)
+    schema = factory(P, lazy=True)
+    assert sorted(schema["definitions"]["Q"]["properties"]) == ["p_a", "pk", "rs"]
+
+
+def test_it__built_on_first_access():
+    from alchemyjsonschema.tests.models import A0
+
+    schema = _makeOne()(A0, lazy=True)
+    assert schema["properties"]["children"] == {
+        "type": "array",
+        "items": {"$ref": "#/definitions/A1"},
+    }
+    assert _pending(schema) == ["A1", "A2"]
+
+    a1 = schema["definitions"]["A1"]
+    assert a1["required"] == ["pk"]
+    assert _pending(schema) == ["A2"]
+
+
+def test_it__without_relationships():
+    from alchemyjsonschema.tests.models import MyModel
+
+    schema = _makeOne()(MyModel, lazy=True)
+    assert "definitions" not in schema
+
+
+def test_get_reference():
+    from alchemyjsonschema.tests.models import A0
+    from alchemyjsonschema.dictify import get_reference
+
+    schema = _makeOne()(A0, lazy=True)
+    result = get_reference(schema["properties"]["children"]["items"], schema)
+    assert sorted(result["properties"]) == ["children", "name", "pk"]
+
+
+def test_validation__only_needed_definitions_are_built():
+    from jsonschema import Draft4Validator
+    from alchemyjsonschema.tests.models import A0
+
+    schema = _makeOne()(A0, lazy=True)
+    validator = Draft4Validator(schema)
+
+    assert list(validator.iter_errors({"pk": 1, "name": "foo"})) == []
+    assert _pending(schema) == ["A1", "A2"]
+
+    errors = list(validator.iter_errors({"pk": 1, "children": [{"pk": "x"}]}))
+    assert len(errors) == 1
+    assert _pending(schema) == ["A2"]
+
+
+def test_copy_and_pickle__as_plain_dict():
+    import copy
+    import pickle
+    from alchemyjsonschema.tests.models import A0
+
+    expected = _makeOne()(A0)
+    for convert in [copy.deepcopy, lambda x: pickle.loads(pickle.dumps(x))]:
+        result = convert(_makeOne()(A0, lazy=True))
+        assert type(result["definitions"]) is dict
+        assert result == expected
+
+
+def test_materialize():
+    from alchemyjsonschema import materialize
+    from alchemyjsonschema.tests.models import A0
+
+    schema = materialize(_makeOne()(A0, lazy=True))
+    assert _pending(schema) == []
+    assert sorted(dict(schema["definitions"])) == ["A1", "A2"]
+
+
+def test_merge__dict_and_update():
+    # e.g. definitions.update(schema.pop("definitions")) in transform_by_model()
+    from alchemyjsonschema.tests.models import A0
+
+    def update(d):
+        merged = {}
+        merged.update(d)
+        return merged
+
+    factory = _makeOne()
+    expected = factory(A0)["definitions"]
+    merges = [dict, update, lambda d: {**d}, lambda d: {k: d[k] for k in d}]
+    for merge in merges:
+        definitions = factory(A0, lazy=True)["definitions"]
+        result = merge(definitions)
+        assert type(result) is dict
+        assert result == expected
@@ -0,0 +1,126 @@
+# -*- coding:utf-8 -*-
+import pytest
+
+
+class _Counter(object):
+    def __init__(self):
+        self.n = 0
+
+    def __call__(self, *args, **kwargs):
+        self.n += 1
+
+
+@pytest.fixture
+def engine():
+    import sqlalchemy as sa
+    from sqlalchemy.orm import Session
+    from datetime import datetime
+    from alchemyjsonschema.tests.models import Base, Group, User, A0, A1, A2
+
+    engine = sa.create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        for i in range(5):
+            group = Group(pk=i, name="g", color="red", created_at=datetime(2000, 1, 1))
+            session.add(group)
+            session.add_all(
+                [User(pk=i * 3 + j, name="u", group=group) for j in range(3)]
+            )
+            a1s = [
+                A1(pk=i * 10 + j, name="a1", children=[A2(pk=i * 10 + j, name="a2")])
+                for j in range(2)
+            ]
+            session.add(A0(pk=i, name="a0", children=a1s))
+        session.commit()
+
+    engine.counter = _Counter()
+    sa.event.listen(engine, "before_cursor_execute", engine.counter)
+    return engine
+
+
+def _load(engine, model, schema, options):
+    import sqlalchemy as sa
+    from sqlalchemy.orm import Session
+    from alchemyjsonschema.dictify import jsonify
+
+    engine.counter.n = 0
+    with Session(engine) as session:
+        stmt = sa.select(model).options(*options).order_by(model.pk)
+        return [jsonify(ob, schema) for ob in session.scalars(stmt)]
+
+
+@pytest.mark.parametrize(
+    "model_name, n",
+    [("User", 1), ("Group", 2), ("A0", 3), ("A1", 2), ("A2", 1)],
+)
+def test_no_more_queries(engine, model_name, n):
+    from alchemyjsonschema import SchemaFactory, StructuralWalker
+    from alchemyjsonschema.loading import loader_options
+    from alchemyjsonschema.tests import models
+
+    model = getattr(models, model_name)
+    schema = SchemaFactory(StructuralWalker)(model)
+
+    expected = _load(engine, model, schema, [])
+    assert engine.counter.n > n  # N+1
+
+    result = _load(engine, model, schema, loader_options(model, schema))
+    assert engine.counter.n == n
+    assert result == expected
+
+
+def test_load_only(engine):
+    import sqlalchemy as sa
+    from sqlalchemy.orm import Session
+    from alchemyjsonschema import SchemaFactory, StructuralWalker
+    from alchemyjsonschema.loading import loader_options
+    from alchemyjsonschema.tests.models import User
+
+    factory = SchemaFactory(StructuralWalker)
+    schema = factory(User, includes=["name", "group"])  # group_id is not included
+    options = loader_options(User, schema)
+
+    with Session(engine) as session:
+        user = session.scalars(sa.select(User).options(*options)).first()
+        unloaded = sa.inspect(user).unloaded
+        assert "created_at" in unloaded
+        assert "group_id" not in unloaded  # required by User.group
+        assert "created_at" in sa.inspect(user.group).unloaded
+
+
+def test_strategy(engine):
+    from sqlalchemy.orm import selectinload
+    from alchemyjsonschema import SchemaFactory, StructuralWalker
+    from alchemyjsonschema.loading import loader_options
+    from alchemyjsonschema.tests.models import User
+
+    schema = SchemaFactory(StructuralWalker)(User)
+    options = loader_options(User, schema, strategy=lambda prop: selectinload)
+    expected = _load(engine, User, schema, [])
+    assert _load(engine, User, schema, options) == expected
+    assert engine.counter.n == 2
+
+
+def test_foreign_key_walker(engine):
+    from alchemyjsonschema import SchemaFactory, ForeignKeyWalker
+    from alchemyjsonschema.loading import loader_options
+    from alchemyjsonschema.tests.models import User
+
+    schema = SchemaFactory(ForeignKeyWalker)(User)
+    options = loader_options(User, schema)
+    assert len(options) == 1  # load_only()
+    assert loader_options(User, schema, columns=False) == []
+
+
+def test_mapping(engine):
+    from alchemyjsonschema import SchemaFactory, StructuralWalker
+    from alchemyjsonschema.mapping import Draft4MappingFactory
+    from alchemyjsonschema.tests import models
+
+    factory = Draft4MappingFactory(SchemaFactory(StructuralWalker), models)
+    mapping = factory(models.Group)
+    expected = _load(engine, models.Group, mapping.schema, [])
+    assert _load(engine, models.Group, mapping.schema, mapping.loader_options()) == (
+        expected
+    )
+    assert engine.counter.n == 2
@@ -0,0 +1,59 @@
+# -*- coding:utf-8 -*-
+def _callFUT(*args, **kwargs):
+    from alchemyjsonschema import get_mapper_plan
+
+    return get_mapper_plan(*args, **kwargs)
+
+
+def test_it():
+    from sqlalchemy.inspection import inspect
+    from alchemyjsonschema.tests.models import User
+
+    mapper = inspect(User)
+    plan = _callFUT(mapper)
+
+    assert plan is _callFUT(mapper)
+    assert [p.key for p in plan.columns] == ["pk", "name", "group_id", "created_at"]
+    assert [p.key for p in plan.foreign_keys] == ["group_id"]
+    assert [p.key for p in plan.relationships] == ["group"]
+
+
+def test_it__shared_by_walkers():
+    from alchemyjsonschema import ForeignKeyWalker, StructuralWalker
+    from alchemyjsonschema.tests.models import User
+
+    assert ForeignKeyWalker(User).plan is StructuralWalker(User).plan
+
+
+def test_it__cleared_after_configure():
+    import sqlalchemy as sa
+    import sqlalchemy.orm as orm
+    from sqlalchemy.ext.declarative import declarative_base
+    from alchemyjsonschema import StructuralWalker
+
+    Base = declarative_base()
+
+    class Parent(Base):
+        __tablename__ = "Parent"
+        pk = sa.Column(sa.Integer, primary_key=True)
+
+    assert [p.key for p in StructuralWalker(Parent).walk()] == ["pk"]
+
+    class Child(Base):
+        __tablename__ = "Child"
+        pk = sa.Column(sa.Integer, primary_key=True)
+        parent_id = sa.Column(sa.Integer, sa.ForeignKey(Parent.pk))
+        parent = orm.relationship(Parent, backref="children")
+
+    orm.configure_mappers()
+    assert [p.key for p in StructuralWalker(Parent).walk()] == ["pk", "children"]
+
+
+def test_walker__history():
+    from sqlalchemy.inspection import inspect
+    from alchemyjsonschema import StructuralWalker
+    from alchemyjsonschema.tests.models import User
+
+    group = inspect(User).relationships["group"]
+    walker = StructuralWalker(User, history=[group])
+    assert [p.key for p in walker.walk()] == ["pk", "name", "created_at"]
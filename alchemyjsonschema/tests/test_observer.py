@@ -0,0 +1,104 @@
+# -*- coding:utf-8 -*-
+def _makeFactory(observer):
+    from alchemyjsonschema import SchemaFactory, StructuralWalker
+
+    return SchemaFactory(StructuralWalker, observer=observer)
+
+
+class _Recorder(object):
+    def __init__(self):
+        self.events = []
+
+    def model_start(self, model):
+        self.events.append(("model_start", model.__name__))
+
+    def model_end(self, model, elapsed):
+        assert elapsed >= 0
+        self.events.append(("model_end", model.__name__))
+
+    def child_schema_start(self, prop):
+        self.events.append(("child_schema_start", prop.key))
+
+    def child_schema_end(self, prop, elapsed):
+        self.events.append(("child_schema_end", prop.key))
+
+    def classified(self, column, type_, elapsed):
+        self.events.append(("classified", column.name))
+
+    def restricted(self, column, fn, elapsed):
+        self.events.append(("restricted", column.name, fn.__name__))
+
+
+def test_events():
+    from alchemyjsonschema.tests.models import User
+
+    recorder = _Recorder()
+    _makeFactory(recorder)(User)
+
+    events = recorder.events
+    assert events[0] == ("model_start", "User")
+    assert events[-1] == ("model_end", "User")
+    assert ("restricted", "name", "string_max_length") in events
+
+    start = events.index(("child_schema_start", "group"))
+    end = events.index(("child_schema_end", "group"))
+    assert ("classified", "color") in events[start:end]
+    assert ("classified", "pk") in events[:start]
+
+
+def test_result_is_not_changed():
+    from alchemyjsonschema import SchemaFactory, StructuralWalker
+    from alchemyjsonschema.observer import CostCollector
+    from alchemyjsonschema.tests.models import A0
+
+    expected = SchemaFactory(StructuralWalker)(A0)
+    assert _makeFactory(CostCollector())(A0) == expected
+
+
+def test_collector():
+    from alchemyjsonschema.observer import CostCollector
+    from alchemyjsonschema.tests.models import A0, A1
+
+    collector = CostCollector()
+    factory = _makeFactory(collector)
+    factory(A0)
+    factory(A1)
+
+    costs = collector.costs
+    assert collector.stack == []
+    assert (costs["A0"].calls, costs["A0"].expansions) == (1, 1)  # A1.parent
+    assert (costs["A1"].calls, costs["A1"].expansions) == (1, 1)
+    assert (costs["A2"].calls, costs["A2"].expansions) == (0, 2)
+    assert costs["A0"].lookups == 2 * 2
+    assert costs["A2"].lookups == 2 * 2
+
+    for c in costs.values():
+        assert 0 <= c.self <= c.total
+    assert costs["A1"].total >= costs["A2"].total
+    assert [c.name for c in collector.sorted("total")][0] in ("A0", "A1")
+
+
+def test_collector__report():
+    from io import StringIO
+    from alchemyjsonschema.observer import CostCollector
+    from alchemyjsonschema.tests.models import Group, User
+
+    collector = CostCollector()
+    factory = _makeFactory(collector)
+    factory(Group)
+    factory(User)
+
+    out = StringIO()
+    collector.report(out=out, limit=1)
+    lines = out.getvalue().splitlines()
+    assert len(lines) == 2
+    assert lines[0].split()[0] == "model"
+    assert lines[1].split()[0] == collector.sorted()[0].name
+
+
+def test_pickle__observer_is_dropped():
+    import pickle
+    from alchemyjsonschema.observer import CostCollector
+
+    factory = pickle.loads(pickle.dumps(_makeFactory(CostCollector())))
+    assert factory.observer is None
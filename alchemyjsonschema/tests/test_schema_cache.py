@@ -0,0 +1,119 @@
+# -*- coding:utf-8 -*-
+def _getTarget():
+    from alchemyjsonschema import SchemaFactory
+
+    return SchemaFactory
+
+
+def _makeOne(*args, **kwargs):
+    from alchemyjsonschema import StructuralWalker
+
+    return _getTarget()(StructuralWalker, *args, **kwargs)
+
+
+def _makeCache(*args, **kwargs):
+    from alchemyjsonschema import SchemaCache
+
+    return SchemaCache(*args, **kwargs)
+
+
+def test_it():
+    from alchemyjsonschema.tests.models import Group
+
+    cache = _makeCache()
+    target = _makeOne(cache=cache)
+
+    result = target(Group, excludes=["pk"])
+    assert result == _makeOne()(Group, excludes=["pk"])
+    assert len(cache) == 1
+
+    # deep copied, so mutation is safe
+    result["properties"].pop("name")
+    result2 = target(Group, excludes=["pk"])
+    assert "name" in result2["properties"]
+    assert len(cache) == 1
+
+
+def test_it__options_are_part_of_key():
+    from alchemyjsonschema.tests.models import Group
+
+    cache = _makeCache()
+    target = _makeOne(cache=cache)
+
+    target(Group)
+    target(Group, includes=["pk"])
+    target(Group, overrides={"name": {"maxLength": 10}})
+    target(Group, depth=1)
+    assert len(cache) == 4
+
+    result = target(Group, overrides={"name": {"maxLength": 10}})
+    assert result == _makeOne()(Group, overrides={"name": {"maxLength": 10}})
+    assert len(cache) == 4
+
+
+def test_it__lru():
+    from alchemyjsonschema.tests.models import Group, User, A0
+
+    cache = _makeCache(maxsize=2)
+    target = _makeOne(cache=cache)
+
+    target(Group)
+    target(User)
+    target(Group)
+    target(A0)
+    assert [k[0] for k in cache.store] == [Group, A0]
+
+
+def test_it__freeze():
+    import pytest
+    from alchemyjsonschema import freeze
+    from alchemyjsonschema.tests.models import Group
+
+    target = _makeOne(cache=_makeCache(view=freeze))
+    result = target(Group)
+
+    assert result["title"] == "Group"
+    assert result["required"] == ("pk",)
+    with pytest.raises(TypeError):
+        result["properties"]["name"] = {}
+
+
+def test_it__cleared_by_configure_mappers():
+    import sqlalchemy as sa
+    import sqlalchemy.orm as orm
+    from sqlalchemy.ext.declarative import declarative_base
+    from alchemyjsonschema.tests.models import Group
+
+    cache = _makeCache()
+    target = _makeOne(cache=cache)
+    target(Group)
+    assert len(cache) == 1
+
+    Base = declarative_base()
+
+    class Model(Base):
+        __tablename__ = "Model"
+        pk = sa.Column(sa.Integer, primary_key=True)
+
+    orm.configure_mappers()
+    assert len(cache) == 0
+
+
+def test_it__lazy_is_not_mixed():
+    from copy import deepcopy
+    from alchemyjsonschema import LazyDefinitions
+    from alchemyjsonschema.tests.models import A0
+
+    def is_lazy(schema):
+        definitions = schema["definitions"]
+        return isinstance(definitions, LazyDefinitions) and bool(definitions.pending)
+
+    expected = _makeOne()(A0)
+    for view in [None, deepcopy]:
+        for order in [(True, False), (False, True)]:
+            target = _makeOne(cache=_makeCache(view=view))
+            for lazy in order:
+                result = target(A0, lazy=lazy)
+                assert is_lazy(result) == lazy, (view, order, lazy)
+                assert result == expected
+            assert len(target.cache) == 1  # only eager one
@@ -0,0 +1,129 @@
+# -*- coding:utf-8 -*-
+def _callFUT(*args, **kwargs):
+    from alchemyjsonschema.stream import iterencode
+
+    return iterencode(*args, **kwargs)
+
+
+def _callFUT2(*args, **kwargs):
+    from alchemyjsonschema.stream import dump
+
+    return dump(*args, **kwargs)
+
+
+def _makeGroups(n):
+    from alchemyjsonschema.tests.models import Group, User
+    from datetime import datetime
+
+    created_at = datetime(2000, 1, 1)
+    return [
+        Group(
+            pk=i,
+            name="group{}".format(i),
+            created_at=created_at,
+            users=[User(pk=i, name="user{}".format(i))],
+        )
+        for i in range(n)
+    ]
+
+
+def _makeSchema():
+    from alchemyjsonschema import SchemaFactory, StructuralWalker
+    from alchemyjsonschema.tests.models import Group
+
+    return SchemaFactory(StructuralWalker)(Group)
+
+
+def test_it():
+    import json
+    from alchemyjsonschema.dictify import jsonify
+
+    schema = _makeSchema()
+    groups = _makeGroups(3)
+
+    chunks = list(_callFUT(iter(groups), schema))
+    assert len(chunks) == 4
+    assert json.loads("".join(chunks)) == [jsonify(g, schema) for g in groups]
+
+
+def test_it__empty():
+    schema = _makeSchema()
+    assert "".join(_callFUT([], schema)) == "[]"
+
+
+def test_it__lines():
+    import json
+    from alchemyjsonschema.dictify import jsonify
+
+    schema = _makeSchema()
+    groups = _makeGroups(2)
+
+    text = "".join(_callFUT(groups, schema, lines=True))
+    assert text.endswith("\n")
+    lines = text.splitlines()
+    assert [json.loads(line) for line in lines] == [jsonify(g, schema) for g in groups]
+
+
+def test_dump():
+    import json
+    from io import StringIO
+    from alchemyjsonschema.dictify import jsonify
+
+    schema = _makeSchema()
+    groups = _makeGroups(3)
+
+    fp = StringIO()
+    _callFUT2(groups, fp, schema, verbose=True)
+    expected = [jsonify(g, schema, verbose=True) for g in groups]
+    assert json.loads(fp.getvalue()) == expected
+
+
+def test_mapping():
+    import json
+    from io import StringIO
+    from alchemyjsonschema import SchemaFactory, StructuralWalker
+    from alchemyjsonschema.mapping import Draft4MappingFactory
+    from alchemyjsonschema.tests import models
+
+    factory = Draft4MappingFactory(SchemaFactory(StructuralWalker), models)
+    mapping = factory(models.Group)
+    groups = _makeGroups(2)
+
+    fp = StringIO()
+    mapping.dump_objects(groups, fp)
+    expected = [mapping.jsondict_from_object(g) for g in groups]
+    assert json.loads(fp.getvalue()) == expected
+    assert json.loads("".join(mapping.iterencode_objects(groups))) == expected
+
+
+def test_it__memory_is_not_growing():
+    import gc
+    import tracemalloc
+    from types import SimpleNamespace
+
+    schema = _makeSchema()
+
+    class _Null(object):
+        def write(self, s):
+            pass
+
+    def gen(n):
+        # created one by one, and released after dumping (no reference cycles,
+        # not depending on gc, unlike backrefs of mapped objects)
+        for i in range(n):
+            user = SimpleNamespace(pk=i, name="u", created_at=None)
+            yield SimpleNamespace(
+                pk=i, name="g", color=None, created_at=None, users=[user]
+            )
+
+    def peak(n):
+        gc.collect()
+        tracemalloc.start()
+        try:
+            _callFUT2(gen(n), _Null(), schema)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    peak(10)  # warming up (e.g. compiled plan)
+    assert peak(4000) < peak(1000) * 1.5
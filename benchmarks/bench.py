@@ -0,0 +1,254 @@
+# -*- coding:utf-8 -*-
+"""
+benchmark of alchemyjsonschema, with synthetic models
+
+    $ python benchmarks/bench.py --width 20 --depth 2 --fanout 2 --rows 200
+    $ python benchmarks/bench.py --compare previous.json
+
+results are written as json (stdout or --out), the summary is written to stderr.
+"""
+
+import argparse
+import gc
+import itertools
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from types import SimpleNamespace
+
+import sqlalchemy as sa
+import sqlalchemy.orm as orm
+from sqlalchemy.ext.declarative import declarative_base
+from jsonschema import Draft4Validator, FormatChecker
+
+from alchemyjsonschema import SchemaFactory, StructuralWalker
+from alchemyjsonschema.dictify import (
+    jsonify,
+    jsonify_many,
+    compile_jsonify,
+    compile_normalize,
+    dictify,
+    normalize,
+    prepare,
+    objectify,
+    apply_changes,
+    validate_all,
+    ModelLookup,
+)
+
+COLUMN_TYPES = [
+    (lambda: sa.String(255), lambda i: "value{}".format(i)),
+    (lambda: sa.Integer, lambda i: i),
+    (lambda: sa.DateTime, lambda i: datetime(2000, 1, 1, i % 24)),
+    (lambda: sa.Boolean, lambda i: bool(i % 2)),
+    (lambda: sa.Float, lambda i: i / 3.0),
+]
+
+
+def make_models(width, depth, fanout):
+    """tree of models. each model has `width` columns, `fanout` one-to-many relationships"""
+    Base = declarative_base()
+    models = {}
+
+    def define(name, parent, level):
+        attrs = {
+            "__tablename__": name,
+            "id": sa.Column(sa.Integer, primary_key=True),
+        }
+        for i in range(width):
+            type_, _ = COLUMN_TYPES[i % len(COLUMN_TYPES)]
+            attrs["c{}".format(i)] = sa.Column(type_(), nullable=(i % 3 != 0))
+        if parent is not None:
+            attrs["parent_id"] = sa.Column(sa.Integer, sa.ForeignKey(parent + ".id"))
+        children = []
+        if level < depth:
+            for j in range(fanout):
+                child = "{}_{}".format(name, j)
+                attrs[child] = orm.relationship(child, uselist=True)
+                children.append(child)
+        models[name] = type(name, (Base,), attrs)
+        for child in children:
+            define(child, name, level + 1)
+
+    define("M", None, 0)
+    orm.configure_mappers()
+    return models
+
+
+def make_object(models, model, items, seq):
+    mapper = sa.inspect(model)
+    ob = model(id=next(seq))
+    for i, (_, gen) in enumerate(_column_generators(mapper)):
+        setattr(ob, "c{}".format(i), gen(ob.id))
+    for prop in mapper.relationships:
+        child_model = prop.mapper.class_
+        setattr(
+            ob,
+            prop.key,
+            [make_object(models, child_model, items, seq) for _ in range(items)],
+        )
+    return ob
+
+
+def _column_generators(mapper):
+    n = len([c for c in mapper.local_table.columns if c.name.startswith("c")])
+    return [COLUMN_TYPES[i % len(COLUMN_TYPES)] for i in range(n)]
+
+
+def count_objects(fanout, depth, items):
+    return sum((fanout * items) ** i for i in range(depth + 1))
+
+
+def measure(fn, number, repeat):
+    # best of `repeat` runs, and peak memory of one run
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        st = time.perf_counter()
+        for _ in range(number):
+            fn()
+        timings.append((time.perf_counter() - st) / number)
+
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(timings), peak
+
+
+def run(args):
+    models = make_models(args.width, args.depth, args.fanout)
+    root = models["M"]
+    module = SimpleNamespace(**models)
+
+    factory = SchemaFactory(StructuralWalker)
+    schema = factory(root)
+    validator = Draft4Validator(schema, format_checker=FormatChecker())
+
+    seq = itertools.count(1)
+    obs = [make_object(models, root, args.items, seq) for _ in range(args.rows)]
+    jsondicts = [jsonify(ob, schema, verbose=True) for ob in obs]
+    dicts = [dictify(ob, schema) for ob in obs]
+    plan = compile_jsonify(schema)
+    normalize_plan = compile_normalize(schema)
+
+    def do_objectify():
+        for d in dicts:
+            objectify(d, schema, ModelLookup(module), strict=False)
+
+    def do_apply_changes():
+        for ob, d in zip(obs, dicts):
+            apply_changes(ob, d, schema, ModelLookup(module))
+
+    benchmarks = [
+        ("SchemaFactory.__call__", 1, lambda: factory(root)),
+        ("jsonify", args.rows, lambda: [jsonify(ob, schema) for ob in obs]),
+        ("jsonify(compiled)", args.rows, lambda: [plan(ob) for ob in obs]),
+        ("jsonify_many", args.rows, lambda: list(jsonify_many(obs, schema))),
+        ("normalize", args.rows, lambda: [normalize(d, schema) for d in jsondicts]),
+        (
+            "normalize(compiled)",
+            args.rows,
+            lambda: [normalize_plan(d) for d in jsondicts],
+        ),
+        ("prepare", args.rows, lambda: [prepare(d, schema) for d in jsondicts]),
+        ("objectify", args.rows, do_objectify),
+        ("apply_changes", args.rows, do_apply_changes),
+        (
+            "validate_all",
+            args.rows,
+            lambda: [validate_all(d, validator) for d in jsondicts],
+        ),
+    ]
+
+    results = []
+    for name, rows, fn in benchmarks:
+        if args.only and name not in args.only:
+            continue
+        seconds, peak = measure(fn, args.number, args.repeat)
+        results.append(
+            {
+                "name": name,
+                "seconds": seconds,
+                "rows_per_second": rows / seconds,
+                "peak_memory": peak,
+            }
+        )
+    return {
+        "params": {
+            "width": args.width,
+            "depth": args.depth,
+            "fanout": args.fanout,
+            "items": args.items,
+            "rows": args.rows,
+            "objects_per_row": count_objects(args.fanout, args.depth, args.items),
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "sqlalchemy": sa.__version__,
+            "alchemyjsonschema": _version(),
+        },
+        "results": results,
+    }
+
+
+def _version():
+    try:
+        from importlib.metadata import version
+
+        return version("alchemyjsonschema")
+    except Exception:
+        return None
+
+
+def report(data, previous=None, out=sys.stderr):
+    before = {}
+    if previous is not None:
+        before = {r["name"]: r for r in previous["results"]}
+
+    print("params: {}".format(data["params"]), file=out)
+    for r in data["results"]:
+        line = "{:<24} {:>12.6f}s {:>14.1f} rows/s {:>12} bytes".format(
+            r["name"], r["seconds"], r["rows_per_second"], r["peak_memory"]
+        )
+        if r["name"] in before:
+            line += "  x{:.2f}".format(before[r["name"]]["seconds"] / r["seconds"])
+        print(line, file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--width", default=20, type=int, help="columns per model")
+    parser.add_argument("--depth", default=2, type=int, help="depth of relationships")
+    parser.add_argument("--fanout", default=2, type=int, help="relationships per model")
+    parser.add_argument("--items", default=2, type=int, help="children per relation")
+    parser.add_argument("--rows", default=100, type=int)
+    parser.add_argument("--number", default=1, type=int)
+    parser.add_argument("--repeat", default=3, type=int)
+    parser.add_argument("--only", action="append", help="benchmark name")
+    parser.add_argument("--out", default=None, help="output to file (json)")
+    parser.add_argument("--compare", default=None, help="previous result (json)")
+    args = parser.parse_args(argv)
+
+    data = run(args)
+
+    previous = None
+    if args.compare is not None:
+        with open(args.compare) as rf:
+            previous = json.load(rf)
+    report(data, previous=previous)
+
+    if args.out is None:
+        json.dump(data, sys.stdout, indent=2)
+        print("")
+    else:
+        with open(args.out, "w") as wf:
+            json.dump(data, wf, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -14,7 +14,6 @@ install_requires = [
     "sqlalchemy",
     "jsonschema",
     "isodate",  # hmm.
-    "pytz",
     "magicalimport",
     "dictknife>=0.7.2",
 ]